@@ -75,7 +75,7 @@ if __name__ == "__main__":
     logging.info("Reading QA-SRL from: {}".format(fin))
     q = Qa2OIE(fin)
     extractions = [ex
-                   for cur_extractions in list(q.dic.values())
+                   for _, cur_extractions in q.iterSentences()
                    for ex in cur_extractions]
 
     # Analyze frequency
@@ -1,10 +1,40 @@
 ''' 
 Usage:
-   benchmark --gold=GOLD_OIE --out=OUTPUT_FILE (--stanford=STANFORD_OIE | --ollie=OLLIE_OIE |--reverb=REVERB_OIE | --clausie=CLAUSIE_OIE | --openiefour=OPENIEFOUR_OIE | --props=PROPS_OIE)
+   benchmark --gold=GOLD_OIE --out=OUTPUT_FILE [--no-index] [--align] [--stream | --columnar] [--profile] [--cache] [--sweep=THRESHOLDS] [--assignment=ASSIGNMENT] [--matcher=MATCHER] (--stanford=STANFORD_OIE | --ollie=OLLIE_OIE |--reverb=REVERB_OIE | --clausie=CLAUSIE_OIE | --openiefour=OPENIEFOUR_OIE | --props=PROPS_OIE)
+   benchmark --gold=GOLD_OIE --outdir=OUTPUT_DIR [--no-index] [--align] [--stream | --columnar] [--profile] [--cache] [--sweep=THRESHOLDS] [--assignment=ASSIGNMENT] [--matcher=MATCHER] [--manifest=MANIFEST] [--jobs=JOBS] [--bootstrap=SAMPLES] [--stanford=STANFORD_OIE]... [--ollie=OLLIE_OIE]... [--reverb=REVERB_OIE]... [--clausie=CLAUSIE_OIE]... [--openiefour=OPENIEFOUR_OIE]... [--props=PROPS_OIE]...
 
 Options:
   --gold=GOLD_OIE              The gold reference Open IE file (by default, it should be under ./oie_corpus/all.oie).
-  --out-OUTPUT_FILE            The output file, into which the precision recall curve will be written.
+  --out=OUTPUT_FILE            The output file, into which the precision recall curve will be written.
+  --outdir=OUTPUT_DIR          Evaluate several systems at once, writing a precision recall curve per system into OUTPUT_DIR.
+  --manifest=MANIFEST          Tab separated file listing systems to evaluate, one per line: FORMAT, INPUT_FILE and an optional output NAME.
+  --jobs=JOBS                  Number of systems to evaluate in parallel (defaults to the number of cpus).
+  --bootstrap=SAMPLES          Compare every pair of systems with a paired bootstrap over gold sentences, using SAMPLES replicates,
+                               and write confidence intervals and p-values of their AUC and F1 differences to OUTPUT_DIR/bootstrap.tsv.
+  --no-index                   Parse the gold from scratch, instead of through its cached index (GOLD_OIE.idx).
+  --align                      Evaluate predicted sentences which aren't in the gold against the most similar gold sentence
+                               (e.g., when tokenized differently), if there's a similar enough one. Sentences found in the gold
+                               take precedence, so with --stream the aligned sentences are evaluated at the end of the output.
+  --stream                     Read system outputs one sentence at a time, assuming that each sentence's extractions are consecutive.
+  --columnar                   Read system outputs into compact arrays, and score them directly from these.
+  --profile                    Write the wall time and peak memory of each stage of evaluating a system (reading, normalization,
+                               matching, PR curve computation and output), along with matcher counts, as JSON next to its
+                               output file (e.g., OUTPUT.profile.json for OUTPUT.dat).
+  --cache                      Keep the matching results of each sentence next to the system's output file (e.g., OUTPUT.matches
+                               for OUTPUT.dat), and only match the sentences whose extractions changed since the previous run.
+                               Not supported with --columnar.
+  --sweep=THRESHOLDS           Comma separated values of the matcher's threshold (e.g., Matcher.LEXICAL_THRESHOLD), at each of which
+                               to evaluate the systems, scoring each pair of extractions only once. Writes a PR curve per system
+                               and threshold (e.g., sweep/t0.25/OUTPUT.dat for OUTPUT.dat), and the AUC, F1 and rank of each
+                               system at each threshold to OUTPUT_DIR/sweep.tsv (or next to OUTPUT_FILE).
+                               Not supported with --columnar, --cache or --bootstrap.
+  --assignment=ASSIGNMENT      How predicted extractions are assigned to the gold extractions of each sentence: greedy takes the
+                               first matching extraction of each gold extraction, in order, and optimal finds a maximum weight
+                               one-to-one assignment, weighted by the matcher's score [default: greedy].
+  --matcher=MATCHER            The function matching predicted extractions to gold extractions: lexical (the predicates share a
+                               lemma, and the prediction covers enough of the gold's words), bleu (NLTK's BLEU of the prediction
+                               against the gold), fastbleu (the same BLEU, computed in bulk) or bow (the same words) [default: lexical].
+                               Only lexical is supported with --columnar.
   --clausie=CLAUSIE_OIE        Read ClausIE format from file CLAUSIE_OIE.
   --ollie=OLLIE_OIE            Read OLLIE format from file OLLIE_OIE.
   --openiefour=OPENIEFOUR_OIE  Read Open IE 4 format from file OPENIEFOUR_OIE.
@@ -14,8 +44,16 @@ Options:
 '''
 import docopt
 import string
+import os
+import sys
+from functools import lru_cache
+from collections import defaultdict
 import numpy as np
-from sklearn.metrics import precision_recall_curve
+from pr_curve import PRCurve
+from bootstrap import PairedBootstrap
+from sentence_aligner import SentenceAligner
+import profiler
+from profiler import Profiler, profileFilename
 import re
 import logging
 logging.basicConfig(level = logging.INFO)
@@ -29,90 +67,398 @@ from oie_readers.propsReader import PropSReader
 
 from oie_readers.goldReader import GoldReader
 from matcher import Matcher
+from gold_index import GoldIndex
+from match_cache import MatchCache
+from fork_pool import forkMap
 
 class Benchmark:
     ''' Compare the gold OIE dataset against a predicted equivalent '''
-    def __init__(self, gold_fn):
-        ''' Load gold Open IE, this will serve to compare against using the compare function '''
-        gr = GoldReader() 
-        gr.read(gold_fn)
-        self.gold = gr.oie
+    def __init__(self, gold_fn, useIndex = True, align = False, profile = False, assignment = 'greedy'):
+        ''' Load gold Open IE, this will serve to compare against using the compare function.
+            If useIndex is set, the gold is loaded through (and stored in) a precompiled index.
+            If align is set, predicted sentences missing from the gold are aligned to similar gold sentences.
+            If profile is set, loading the gold and evaluating each system in compareSystems are profiled.
+            assignment is a key of Matcher.ASSIGNMENTS, which determines how predicted extractions are
+            assigned to the gold extractions of each sentence. '''
+        if assignment not in Matcher.ASSIGNMENTS:
+            raise ValueError("Unknown assignment: {}".format(assignment))
+        self.assignment = assignment
+        self.profile = profile
+        self.goldProfile = None
+        if profile:
+            with Profiler() as goldProfiler:
+                self.loadGold(gold_fn, useIndex, align)
+            self.goldProfile = goldProfiler.summary()
+        else:
+            self.loadGold(gold_fn, useIndex, align)
 
-    def compare(self, predicted, matchingFunc, output_fn):
+    def loadGold(self, gold_fn, useIndex, align):
+        with profiler.stage('gold'):
+            if useIndex:
+                # Normalized once by the index, and shared by all subsequent calls to compare
+                self.gold, self.normalizedGold = GoldIndex(gold_fn, Benchmark.normalizeKey).load()
+                goldCounts = [self.normalizedGold.count(key) for key in self.normalizedGold]
+            else:
+                gr = GoldReader()
+                gr.read(gold_fn)
+                self.gold = gr.oie
+                with profiler.stage('normalize'):
+                    self.normalizedGold = Benchmark.normalizeDict(self.gold)
+                goldCounts = [len(extractions) for extractions in self.normalizedGold.values()]
+
+            # Gold sentences are numbered in order, to report per sentence matching results
+            self.sentenceIndex = dict([(key, i) for i, key in enumerate(self.normalizedGold)])
+            # Number of gold extractions of each sentence, by sentence index
+            self.goldCounts = np.array(goldCounts, dtype = int)
+            # Digests of gold sentences, used by match caches, computed on first use
+            self.goldDigests = {}
+
+        with profiler.stage('align'):
+            self.aligner = SentenceAligner(self.normalizedGold) if align else None
+
+    def resolveKeys(self, predicted):
+        ''' Given (normalized key, value) pairs of predicted sentences, in order, yields the (gold key, value)
+            of each one which is evaluated. Each gold sentence is evaluated against the first predicted
+            sentence with its exact key. Sentences missing from the gold are then aligned (if aligning),
+            in order, each to a gold sentence which wasn't evaluated yet. As exact keys take precedence,
+            aligned sentences are held until all of the predicted sentences were seen. '''
+        evaluated = set()
+        unaligned = []
+        for key, value in predicted:
+            if key in evaluated:
+                logging.warning("Ignoring non consecutive extractions of sentence: {}".format(key))
+            elif key in self.normalizedGold:
+                evaluated.add(key)
+                yield key, value
+            elif self.aligner is not None:
+                unaligned.append((key, value))
+
+        for key, value in unaligned:
+            with profiler.stage('normalize'):
+                goldKey = self.aligner.align(key)
+            if goldKey is None:
+                continue
+            if goldKey in evaluated:
+                logging.warning("Ignoring sentence aligned to an already evaluated gold sentence: {}".format(key))
+                continue
+            evaluated.add(goldKey)
+            yield goldKey, value
+
+    def goldDigest(self, key):
+        if key not in self.goldDigests:
+            self.goldDigests[key] = MatchCache.digest(self.normalizedGold[key])
+        return self.goldDigests[key]
+
+    def compare(self, predicted, matchingFunc, output_fn, matchCache = None):
         ''' Compare gold against predicted using a specified matching function. 
-            Outputs PR curve to output_fn '''
+            predicted is either a dictionary of extractions by sentence, or an iterable
+            of (sentence, extractions) tuples (e.g., OieReader.iterSentences),
+            which is consumed one sentence at a time.
+            If a MatchCache is given, sentences found in it aren't matched again, and the
+            results of the others are added to it.
+            Outputs PR curve to output_fn, and returns the matching results (see matchingResults) '''
         
         y_true = []
         y_scores = []
+        # Gold sentence of each result
+        y_sentences = []
         
         correctTotal = 0
         unmatchedCount = 0        
-        predicted = Benchmark.normalizeDict(predicted)
-        gold = Benchmark.normalizeDict(self.gold)
-                
-        for sent, goldExtractions in list(gold.items()):
-            if sent not in predicted:
-                # The extractor didn't find any extractions for this sentence
-                unmatchedCount += len(goldExtractions)
-                correctTotal += len(goldExtractions)
-                continue
-                
-            predictedExtractions = predicted[sent]
-            
-            for goldEx in goldExtractions:
-                correctTotal += 1
-                found = False
+        gold = self.normalizedGold
+        seen = set()
                 
-                for predictedEx in predictedExtractions:
-                    if matchingFunc(goldEx, 
-                                    predictedEx, 
-                                    ignoreStopwords = True, 
-                                    ignoreCase = True):
-                        
-                        y_true.append(1)
-                        y_scores.append(predictedEx.confidence)
+        for sent, predictedExtractions in self.evaluatedSentences(predicted):
+            seen.add(sent)
+            goldExtractions = gold[sent]
+
+            with profiler.stage('match'):
+                if matchCache is None:
+                    results = Benchmark.matchSentence(goldExtractions, predictedExtractions, matchingFunc,
+                                                      self.assignment)
+                else:
+                    key = MatchCache.key(matchingFunc, self.assignment, self.goldDigest(sent), predictedExtractions)
+                    results = matchCache.get(key)
+                    if results is None:
+                        results = Benchmark.matchSentence(goldExtractions, predictedExtractions, matchingFunc,
+                                                          self.assignment)
+                        matchCache.put(key, results)
+                unmatchedCount += Benchmark.appendResults(results, predictedExtractions, self.sentenceIndex[sent],
+                                                          y_true, y_scores, y_sentences)
+
+                falsePositives = set(results[1])
+                for i, predictedEx in enumerate(predictedExtractions):
+                    if i not in falsePositives:
                         predictedEx.matched.append(output_fn)
 
-                        # Also mark any other predictions with the
-                        # same exact predicate as matched.
-                        # This is to support packages that do conjunction
-                        # splitting, and doesn't affect the results for
-                        # packages that don't.
-                        if predictedEx.splits_conjunctions:
-                            for otherPredictedEx in predictedExtractions:
-                                if otherPredictedEx.pred == predictedEx.pred:
-                                    otherPredictedEx.matched.append(output_fn)
-
-                        found = True
-                        break
-                    
-                if not found:
-                    unmatchedCount += 1
-                    
-            for predictedEx in [x for x in predictedExtractions if (output_fn not in x.matched)]:
-                # Add false positives
-                y_true.append(0)
-                y_scores.append(predictedEx.confidence)
-                
-        y_true = y_true
-        y_scores = y_scores
+        for sent, i in self.sentenceIndex.items():
+            correctTotal += int(self.goldCounts[i])
+            if sent not in seen:
+                # The extractor didn't find any extractions for this sentence
+                unmatchedCount += int(self.goldCounts[i])
         
+        Benchmark.writeCurve(y_true, y_scores, correctTotal, unmatchedCount, output_fn)
+        return Benchmark.matchingResults(y_true, y_scores, y_sentences)
+
+    def sweep(self, predicted, matchingFunc, thresholds, output_fn):
+        ''' Compare gold against predicted, as in compare, at each of the given thresholds of matchingFunc
+            (a key of Matcher.SCORERS). Each pair of extractions is scored only once, and the assignment
+            of each threshold is derived from these scores.
+            Outputs the PR curve of each threshold to sweepFilename(output_fn, threshold), and returns
+            a dictionary from each threshold to its (AUC, max F1). '''
+        scoreMatrix, _ = Matcher.SCORERS[matchingFunc]
+        _, assignAbove = Matcher.ASSIGNMENTS[self.assignment]
+        # (y_true, y_scores, y_sentences) of each threshold
+        results = dict([(threshold, ([], [], [])) for threshold in thresholds])
+        unmatchedCounts = dict([(threshold, 0) for threshold in thresholds])
+        seen = set()
+
+        for sent, predictedExtractions in self.evaluatedSentences(predicted):
+            seen.add(sent)
+            goldExtractions = self.normalizedGold[sent]
+            with profiler.stage('match'):
+                scores = scoreMatrix(goldExtractions, predictedExtractions)
+                # Pairs which can't match, e.g. whose predicates don't share a lemma
+                profiler.count('pairsPruned', np.isneginf(scores).sum())
+                for threshold in thresholds:
+                    sentenceResults = Benchmark.sentenceResults(assignAbove(scores, threshold),
+                                                                predictedExtractions)
+                    unmatchedCounts[threshold] += Benchmark.appendResults(sentenceResults, predictedExtractions,
+                                                                          self.sentenceIndex[sent],
+                                                                          *results[threshold])
+
+        correctTotal = int(self.goldCounts.sum())
+        # The extractor didn't find any extractions for the remaining sentences
+        unseenCount = sum([int(self.goldCounts[i]) for sent, i in self.sentenceIndex.items()
+                           if sent not in seen])
+        ret = {}
+        for threshold in thresholds:
+            y_true, y_scores, _ = results[threshold]
+            curve_fn = sweepFilename(output_fn, threshold)
+            # Systems are evaluated in parallel, and may share the directory
+            os.makedirs(os.path.dirname(curve_fn) or '.', exist_ok = True)
+            curve = Benchmark.writeCurve(y_true, y_scores, correctTotal, unmatchedCounts[threshold] + unseenCount,
+                                         curve_fn)
+            f1, _, _, _ = curve.maxF1()
+            ret[threshold] = (curve.auc(), f1)
+        return ret
+
+    def evaluatedSentences(self, predicted):
+        ''' Yields the (gold key, predicted extractions) of each predicted sentence which is evaluated
+            (see resolveKeys). predicted is either a dictionary of extractions by sentence, or an iterable
+            of (sentence, extractions) tuples, see compare. '''
+        if isinstance(predicted, dict):
+            with profiler.stage('normalize'):
+                predicted = Benchmark.normalizeDict(predicted).items()
+        else:
+            # Keys of streamed sentences are normalized as they're read
+            predicted = profiler.timedIter('normalize', ((Benchmark.normalizeKey(sent), extractions)
+                                                         for sent, extractions in predicted))
+        return self.resolveKeys(predicted)
+
+    @staticmethod
+    def appendResults(results, predictedExtractions, sentenceIndex, y_true, y_scores, y_sentences):
+        ''' Append a sentence's results (see matchSentence) to the lists of y_true, y_scores and y_sentences,
+            returns its number of unmatched gold extractions '''
+        truePositives, falsePositives, unmatched = results
+        for i in truePositives:
+            y_true.append(1)
+            y_scores.append(predictedExtractions[i].confidence)
+            y_sentences.append(sentenceIndex)
+        for i in falsePositives:
+            y_true.append(0)
+            y_scores.append(predictedExtractions[i].confidence)
+            y_sentences.append(sentenceIndex)
+        return unmatched
+
+    @staticmethod
+    def matchSentence(goldExtractions, predictedExtractions, matchingFunc, assignment = 'greedy'):
+        ''' Match the predicted extractions of a sentence against its gold extractions,
+            assigning them by a key of Matcher.ASSIGNMENTS.
+            Returns a tuple of (true positives, false positives, number of unmatched gold extractions),
+            where true positives are the indices of the predicted extractions matched by each of the
+            gold extractions, in order, and false positives are the indices of the unmatched ones. '''
+        assign, _ = Matcher.ASSIGNMENTS[assignment]
+        return Benchmark.sentenceResults(assign(matchingFunc,
+                                                goldExtractions,
+                                                predictedExtractions,
+                                                ignoreStopwords = True,
+                                                ignoreCase = True),
+                                         predictedExtractions)
+
+    @staticmethod
+    def sentenceResults(matches, predictedExtractions):
+        ''' Results of a sentence (see matchSentence), given the index of the predicted extraction
+            matched by each gold extraction (or None) '''
+        truePositives = tuple([match for match in matches if match is not None])
+        matched = set(truePositives)
+        # Predicted extractions by their exact predicate, built on first use
+        byPredicate = None
+
+        for match in truePositives:
+            # Also mark any other predictions with the
+            # same exact predicate as matched.
+            # This is to support packages that do conjunction
+            # splitting, and doesn't affect the results for
+            # packages that don't.
+            predictedEx = predictedExtractions[match]
+            if predictedEx.splits_conjunctions:
+                if byPredicate is None:
+                    byPredicate = defaultdict(list)
+                    for j, otherPredictedEx in enumerate(predictedExtractions):
+                        byPredicate[otherPredictedEx.pred].append(j)
+                matched.update(byPredicate[predictedEx.pred])
+
+        falsePositives = tuple([j for j in range(len(predictedExtractions)) if j not in matched])
+        return truePositives, falsePositives, len(matches) - len(truePositives)
+
+    def compareStore(self, store, matchingFunc, output_fn):
+        ''' Same as compare, for predictions held in an ExtractionStore, whose words
+            were encoded with Matcher.vocab. Matching and scoring work directly on the store's arrays.
+            Currently supports only lexicalMatch.
+            Outputs PR curve to output_fn, and returns the matching results (see matchingResults) '''
+        if matchingFunc is not Matcher.lexicalMatch:
+            raise ValueError("Extraction stores can only be compared with lexicalMatch")
+
+        gold = self.normalizedGold
+        # As in normalizeDict, the last sentence normalized to each key takes it,
+        # and keys are resolved to gold sentences as in compare
+        with profiler.stage('normalize'):
+            keys = dict([(Benchmark.normalizeKey(sent), sentenceId)
+                         for sentenceId, sent in enumerate(store.sentences)])
+        evaluated = sorted([(sentenceId, key) for key, sentenceId in self.resolveKeys(keys.items())])
+
+        # Rows of each sentence, in file order
+        truePositives = []
+        _, assignAbove = Matcher.ASSIGNMENTS[self.assignment]
+        with profiler.stage('match'):
+            order = np.argsort(store.sentenceIds, kind = 'mergesort')
+            bounds = np.searchsorted(store.sentenceIds[order], np.arange(len(store.sentences) + 1))
+            # Lemma ids, aligned with store.predWords
+            predLemmas = Matcher.lemmaIdsOf(store.predWords)
+
+            store.matched[:] = False
+            for sentenceId, key in evaluated:
+                rows = order[bounds[sentenceId]:bounds[sentenceId + 1]]
+                goldExtractions = gold[key]
+                scores = Matcher.lexicalScoreBlocks(Matcher.ragged([Matcher.tokenIds(ex) for ex in goldExtractions]),
+                                                    Matcher.ragged([Matcher.predicateLemmaIds(ex) for ex in goldExtractions]),
+                                                    store.tokenBlock(rows),
+                                                    store.predWordBlock(rows, predLemmas))
+                profiler.count('pairsPruned', np.isneginf(scores).sum())
+
+                for match in assignAbove(scores, Matcher.LEXICAL_THRESHOLD):
+                    if match is None:
+                        continue
+                    row = rows[match]
+                    truePositives.append(row)
+                    store.matched[row] = True
+                    # See compare's handling of conjunction splitting
+                    if store.splitsConjunctions[row]:
+                        pred = store.predTokens(row)
+                        for otherRow in rows:
+                            if np.array_equal(store.predTokens(otherRow), pred):
+                                store.matched[otherRow] = True
+
+        # Gold extractions of sentences which weren't evaluated are unmatched as well
+        correctTotal = int(self.goldCounts.sum())
+        unmatchedCount = correctTotal - len(truePositives)
+
+        # False positives are unmatched predictions in evaluated sentences
+        isEvaluated = np.zeros(len(store.sentences), dtype = bool)
+        isEvaluated[[sentenceId for sentenceId, _ in evaluated]] = True
+        falsePositives = isEvaluated[store.sentenceIds] & ~store.matched
+
+        # Gold sentence of each of the store's evaluated sentences
+        goldSentences = np.zeros(len(store.sentences), dtype = np.int64)
+        goldSentences[[sentenceId for sentenceId, _ in evaluated]] = [self.sentenceIndex[key] for _, key in evaluated]
+
+        truePositives = np.array(truePositives, dtype = np.int64)
+        y_true = np.concatenate([np.ones(len(truePositives)), np.zeros(falsePositives.sum())])
+        y_scores = np.concatenate([store.confidence[truePositives],
+                                   store.confidence[falsePositives]])
+        y_sentences = np.concatenate([goldSentences[store.sentenceIds[truePositives]],
+                                      goldSentences[store.sentenceIds[falsePositives]]])
+        Benchmark.writeCurve(y_true, y_scores, correctTotal, unmatchedCount, output_fn)
+        return Benchmark.matchingResults(y_true, y_scores, y_sentences)
+
+    @staticmethod
+    def matchingResults(y_true, y_scores, y_sentences):
+        ''' Results of matching a system against the gold, as (y_true, y_scores, y_sentences) arrays:
+            whether each result is a true positive, its confidence and the index of its gold sentence '''
+        return (np.array(y_true, dtype = bool),
+                np.array(y_scores, dtype = float),
+                np.array(y_sentences, dtype = np.int64))
+
+    @staticmethod
+    def writeCurve(y_true, y_scores, correctTotal, unmatchedCount, output_fn):
+        ''' Compute the PR curve from the matching results, and write it to output_fn '''
         # recall on y_true, y  (r')_scores computes |covered by extractor| / |True in what's covered by extractor|
         # to get to true recall we do r' * (|True in what's covered by extractor| / |True in gold|) = |true in what's covered| / |true in gold|
-        p, r = Benchmark.prCurve(np.array(y_true), np.array(y_scores),
-                       recallMultiplier = ((correctTotal - unmatchedCount)/float(correctTotal)))
+        with profiler.stage('pr'):
+            curve = PRCurve(y_true, y_scores,
+                            recallMultiplier = ((correctTotal - unmatchedCount)/float(correctTotal)))
+            f1, _, _, _ = curve.maxF1()
+            logging.info("{}: AUC = {:.4f}, max F1 = {:.4f}".format(output_fn, curve.auc(), f1))
+            p, r = curve.sortedCurve()
 
-        # write PR to file
-        with open(output_fn, 'w') as fout:
-            fout.write('{0}\t{1}\n'.format("Precision", "Recall"))
-            for cur_p, cur_r in sorted(zip(p, r), key = lambda cur_p_cur_r: cur_p_cur_r[1]):
-                fout.write('{0}\t{1}\n'.format(cur_p, cur_r))
+        # write PR to file, ordered by recall
+        with profiler.stage('output'):
+            with open(output_fn, 'w') as fout:
+                fout.write('{0}\t{1}\n'.format("Precision", "Recall"))
+                for cur_p, cur_r in zip(p, r):
+                    fout.write('{0}\t{1}\n'.format(cur_p, cur_r))
+        return curve
     
+    def bootstrapSystems(self, systemResults, numSamples, output_fn):
+        ''' Compare each pair of systems with a paired bootstrap over the gold sentences, given their
+            (name, matching results), as returned by compare. Writes the comparisons to output_fn. '''
+        bootstrap = PairedBootstrap(self.goldCounts, numSamples = numSamples)
+        with open(output_fn, 'w') as fout:
+            fout.write('\t'.join(["SystemA", "SystemB", "Metric", "A", "B",
+                                  "DeltaLow", "DeltaHigh", "PValue"]) + '\n')
+            for nameA, nameB, comparison in bootstrap.compareAll(systemResults):
+                for metric in PairedBootstrap.METRICS:
+                    a, b, (low, high), pValue = comparison[metric]
+                    fout.write('\t'.join([nameA, nameB, metric] +
+                                          ['{}'.format(x) for x in [a, b, low, high, pValue]]) + '\n')
+
+    def compareSystems(self, systems, matchingFunc, numJobs = None, stream = False, columnar = False, cache = False,
+                       sweep = None):
+        ''' Compare gold against several systems, each given as a tuple of
+            (format, input filename, output filename), where format is a key of READERS.
+            Systems are evaluated in parallel on a pool of numJobs processes, all sharing this
+            instance's (already loaded) gold.
+            If stream is set, system outputs are read one sentence at a time, instead of
+            being loaded into memory. If columnar is set, they are read into an ExtractionStore.
+            If cache is set, each system's matching results are cached next to its output file (see MatchCache).
+            If sweep is given, it's a list of thresholds of matchingFunc at which systems are evaluated (see Benchmark.sweep),
+            and their (AUC, max F1) at each threshold are returned instead of their matching results.
+            If this instance profiles, each system's profile is written next to its output file.
+            A system which fails (e.g., whose output is missing) is logged and skipped, without stopping the others.
+            Returns the (output filename, matching results) of each system which was evaluated. '''
+        if cache and columnar:
+            raise ValueError("Match caches aren't supported for columnar evaluation")
+        if columnar and (matchingFunc is not Matcher.lexicalMatch):
+            raise ValueError("Columnar evaluation only supports lexicalMatch")
+        if sweep and (cache or columnar):
+            raise ValueError("Threshold sweeps aren't supported for columnar or cached evaluation")
+        # The workers read the gold from this instance, which each of them inherits instead of parsing it again
+        global _benchmark
+        _benchmark = self
+        jobs = [(fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep, self.profile)
+                for (fmt, input_fn, output_fn) in systems]
+        results = forkMap(evaluateSystem, jobs, numJobs)
+
+        failed = [output_fn for output_fn, systemResults in results if systemResults is None]
+        if failed:
+            logging.error("Failed to evaluate {} of {} systems: {}".format(len(failed), len(results), ', '.join(failed)))
+        return [(output_fn, systemResults) for output_fn, systemResults in results if systemResults is not None]
+
     @staticmethod
     def prCurve(y_true, y_scores, recallMultiplier):
         # Recall multiplier - accounts for the percentage examples unreached by 
-        precision, recall, _ = precision_recall_curve(y_true, y_scores)
-        recall = recall * recallMultiplier
+        precision, recall, _ = PRCurve(y_true, y_scores, recallMultiplier).curve()
         return precision, recall
 
     # Helper functions:
@@ -121,8 +467,16 @@ class Benchmark:
         return dict([(Benchmark.normalizeKey(k), v) for k, v in list(d.items())])
     
     @staticmethod
+    @lru_cache(maxsize = 1 << 16)
     def normalizeKey(k):
-        return Benchmark.removePunct(str(Benchmark.PTB_unescape(k.replace(' ',''))))
+        ''' Remove spaces, unescape PTB brackets and remove punctuation.
+            Memoized (up to a bound, so that streaming takes constant memory),
+            as the same sentences are normalized for every system. '''
+        key = k.replace(' ', '')
+        # All escapes start with a dash
+        if '-' in key:
+            key = Benchmark.PTB_unescape(key)
+        return key.translate(Benchmark.PUNCT_TABLE)
 
     @staticmethod
     def PTB_escape(s):
@@ -142,6 +496,8 @@ class Benchmark:
     
     # CONSTANTS
     regex = re.compile('[%s]' % re.escape(string.punctuation))
+    # Deletes punctuation, same as removePunct
+    PUNCT_TABLE = str.maketrans('', '', string.punctuation)
     
     # Penn treebank bracket escapes 
     # Taken from: https://github.com/nlplab/brat/blob/master/server/src/gtbtokenize.py
@@ -152,42 +508,203 @@ class Benchmark:
                    ('{', '-LCB-'),
                    ('}', '-RCB-'),]
 
+# Benchmark instance used by evaluateSystem, set by Benchmark.compareSystems
+_benchmark = None
+
+def evaluateSystem(job):
+    ''' Read a single system output and compare it against the shared gold, profiling it if requested.
+        Returns its output filename along with its results, which are None if it failed.
+        Module level, so that it could be dispatched to a process pool. '''
+    fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep, profile = job
+    try:
+        return profileSystem(fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep, profile)
+    except Exception:
+        logging.exception("Failed to evaluate {} ({} format), skipping it".format(input_fn, fmt))
+        return output_fn, None
+
+def profileSystem(fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep, profile):
+    ''' Score a single system (see scoreSystem), profiling it if requested '''
+    if not profile:
+        return output_fn, scoreSystem(fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep)
+
+    with Profiler() as systemProfiler:
+        results = scoreSystem(fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep)
+    profile_fn = profileFilename(output_fn)
+    logging.info("Writing profile of {} to {}".format(input_fn, profile_fn))
+    systemProfiler.write(profile_fn,
+                         format = fmt,
+                         input = input_fn,
+                         mode = 'columnar' if columnar else ('stream' if stream else 'dict'),
+                         gold = _benchmark.goldProfile)
+    return output_fn, results
+
+def scoreSystem(fmt, input_fn, output_fn, matchingFunc, stream, columnar, cache, sweep):
+    ''' Read a single system output, compare it against the shared gold and return its matching results
+        (or its sweep results, if sweep is given) '''
+    reader = READERS[fmt]()
+    if columnar:
+        store = reader.readStore(input_fn, vocab = Matcher.vocab)
+        logging.info("Writing PR curve of {} to {}".format(reader.name, output_fn))
+        return _benchmark.compareStore(store = store,
+                                       matchingFunc = matchingFunc,
+                                       output_fn = output_fn)
+    if stream:
+        predicted = reader.iterSentences(input_fn)
+    else:
+        reader.read(input_fn)
+        predicted = reader.oie
+    if sweep:
+        logging.info("Writing PR curves of {} at thresholds {}".format(reader.name, sweep))
+        return _benchmark.sweep(predicted = predicted,
+                                matchingFunc = matchingFunc,
+                                thresholds = sweep,
+                                output_fn = output_fn)
+    matchCache = MatchCache(MatchCache.cacheFilename(output_fn)) if cache else None
+    logging.info("Writing PR curve of {} to {}".format(reader.name, output_fn))
+    results = _benchmark.compare(predicted = predicted,
+                                 matchingFunc = matchingFunc,
+                                 output_fn = output_fn,
+                                 matchCache = matchCache)
+    if matchCache is not None:
+        matchCache.save()
+    return results
+
+def readManifest(manifest_fn):
+    ''' Read a tab separated manifest of systems to evaluate.
+        Each line holds a format (a key of READERS), an input file and
+        an optional name for the output file. Empty lines and lines starting with # are ignored. '''
+    ret = []
+    with open(manifest_fn) as fin:
+        for line in fin:
+            line = line.strip()
+            if (not line) or line.startswith('#'):
+                continue
+            data = line.split('\t')
+            fmt, input_fn = data[:2]
+            name = data[2] if len(data) > 2 else None
+            if fmt not in READERS:
+                raise ValueError("Unknown format {} in manifest {}".format(fmt, manifest_fn))
+            ret.append((fmt, input_fn, name))
+    return ret
+
+def sweepFilename(output_fn, threshold):
+    ''' PR curve of a system at one of the thresholds of a sweep, in a directory per threshold
+        next to the system's output file, so that pr_plot.py can plot the systems at each threshold
+        (and doesn't pick up the sweep's curves when plotting the output directory) '''
+    head, tail = os.path.split(output_fn)
+    return os.path.join(head, 'sweep', 't{}'.format(threshold), tail)
+
+def writeSweep(results, output_fn):
+    ''' Write the AUC, F1 and rank (by AUC) of each system at each threshold of a sweep, given
+        the (output filename, sweep results) of each system, as returned by Benchmark.compareSystems.
+        Returns whether the ranking of the systems is the same at all thresholds. '''
+    names = [os.path.splitext(os.path.basename(fn))[0] for fn, _ in results]
+    thresholds = sorted(results[0][1]) if results else []
+    rankings = {}
+    with open(output_fn, 'w') as fout:
+        fout.write('\t'.join(["System", "Threshold", "AUC", "F1", "Rank"]) + '\n')
+        for threshold in thresholds:
+            order = sorted(range(len(results)), key = lambda i: -results[i][1][threshold][0])
+            rankings[threshold] = [names[i] for i in order]
+            for rank, i in enumerate(order):
+                auc, f1 = results[i][1][threshold]
+                fout.write('\t'.join([names[i], '{}'.format(threshold), '{}'.format(auc), '{}'.format(f1),
+                                      '{}'.format(rank + 1)]) + '\n')
+    for threshold in thresholds:
+        logging.info("Ranking at threshold {}: {}".format(threshold, ', '.join(rankings[threshold])))
+    return len(set([tuple(ranking) for ranking in rankings.values()])) <= 1
+
+def outputFilename(outdir, input_fn, name = None):
+    ''' Output file for a system in multi-system mode,
+        defaults to the input file's base name. '''
+    if not name:
+        name = os.path.splitext(os.path.basename(input_fn))[0]
+    return os.path.join(outdir, '{}.dat'.format(name))
+
+# Supported input formats, keyed by their command line flag
+READERS = {'stanford': StanfordReader,
+           'ollie': OllieReader,
+           'reverb': ReVerbReader,
+           'clausie': ClausieReader,
+           'openiefour': OpenieFourReader,
+           'props': PropSReader}
+
+MATCHERS = {'lexical': Matcher.lexicalMatch,
+            'bleu': Matcher.bleuMatch,
+            'fastbleu': Matcher.fastBleuMatch,
+            'bow': Matcher.bowMatch}
+
 
 if __name__ == '__main__':
     args = docopt.docopt(__doc__)
     logging.debug(args)
-    
-    if args['--stanford']:
-        predicted = StanfordReader()
-        predicted.read(args['--stanford'])
-    
-    if args['--props']:
-        predicted = PropSReader()
-        predicted.read(args['--props'])
-       
-    if args['--ollie']:
-        predicted = OllieReader()
-        predicted.read(args['--ollie'])
-    
-    if args['--reverb']:
-        predicted = ReVerbReader()
-        predicted.read(args['--reverb'])
-    
-    if args['--clausie']:
-        predicted = ClausieReader()
-        predicted.read(args['--clausie'])
-        
-    if args['--openiefour']:
-        predicted = OpenieFourReader()
-        predicted.read(args['--openiefour'])
 
-    b = Benchmark(args['--gold'])
-    out_filename = args['--out']
+    # Systems given on the command line (and possibly in a manifest)
+    systems = [(fmt, input_fn, None)
+               for fmt in sorted(READERS)
+               for input_fn in args['--{}'.format(fmt)]]
+
+    if args['--manifest']:
+        systems += readManifest(args['--manifest'])
+
+    if args['--outdir']:
+        outdir = args['--outdir']
+        if not os.path.exists(outdir):
+            os.makedirs(outdir)
+        systems = [(fmt, input_fn, outputFilename(outdir, input_fn, name))
+                   for (fmt, input_fn, name) in systems]
+        out_filenames = [output_fn for (_, _, output_fn) in systems]
+        if len(set(out_filenames)) != len(out_filenames):
+            raise ValueError("Systems must have unique output names: {}".format(out_filenames))
+    else:
+        # Single system mode
+        if len(systems) != 1:
+            raise docopt.DocoptExit("--out evaluates a single system, use --outdir to evaluate {} systems".format(len(systems)))
+        [(fmt, input_fn, _)] = systems
+        systems = [(fmt, input_fn, args['--out'])]
+
+    if args['--matcher'] not in MATCHERS:
+        raise ValueError("Unknown matcher: {}, expected one of {}".format(args['--matcher'], sorted(MATCHERS)))
+    matchingFunc = MATCHERS[args['--matcher']]
+    sweep = [float(threshold) for threshold in args['--sweep'].split(',')] if args['--sweep'] else None
+    if sweep and args['--bootstrap']:
+        raise ValueError("Threshold sweeps can't be bootstrapped")
+    if sweep and (matchingFunc not in Matcher.SCORERS):
+        raise ValueError("The {} matcher doesn't have a threshold to sweep".format(args['--matcher']))
+
+    b = Benchmark(args['--gold'],
+                  useIndex = not args['--no-index'],
+                  align = args['--align'],
+                  profile = args['--profile'],
+                  assignment = args['--assignment'])
+    results = b.compareSystems(systems,
+                               matchingFunc = matchingFunc,
+                               numJobs = int(args['--jobs']) if args['--jobs'] else None,
+                               stream = args['--stream'],
+                               columnar = args['--columnar'],
+                               cache = args['--cache'],
+                               sweep = sweep)
+
+    if sweep:
+        sweep_fn = os.path.join(args['--outdir'], 'sweep.tsv') if args['--outdir'] \
+                   else '{}.sweep.tsv'.format(os.path.splitext(args['--out'])[0])
+        logging.info("Writing sweep results to {}".format(sweep_fn))
+        if writeSweep(results, sweep_fn):
+            logging.info("The ranking of the systems is the same at all thresholds")
+        else:
+            logging.warning("The ranking of the systems changes across thresholds, see {}".format(sweep_fn))
+
+    if args['--bootstrap']:
+        bootstrap_fn = os.path.join(args['--outdir'], 'bootstrap.tsv')
+        logging.info("Writing bootstrap comparisons to {}".format(bootstrap_fn))
+        b.bootstrapSystems([(os.path.splitext(os.path.basename(output_fn))[0], systemResults)
+                            for output_fn, systemResults in results],
+                           numSamples = int(args['--bootstrap']),
+                           output_fn = bootstrap_fn)
 
-    logging.info("Writing PR curve of {} to {}".format(predicted.name, out_filename))
-    b.compare(predicted = predicted.oie, 
-               matchingFunc = Matcher.lexicalMatch,
-               output_fn = out_filename)
+    if len(results) < len(systems):
+        # The systems which were evaluated are written, but the run still fails
+        sys.exit(1)
     
         
         
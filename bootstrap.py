@@ -0,0 +1,136 @@
+"""
+Paired bootstrap significance testing of Open IE systems, evaluated on the same gold.
+Gold sentences are resampled with replacement, and each replicate's PR curve is computed from
+the per-sentence matching results (as returned by Benchmark.compare), weighted by the number of
+times each sentence was drawn. All replicates of a system are computed at once with numpy.
+"""
+import numpy as np
+
+class PairedBootstrap:
+    ''' Bootstrap replicates over gold sentences, shared by all of the compared systems '''
+    def __init__(self, goldCounts, numSamples = 1000, seed = 0):
+        '''
+        goldCounts - number of gold extractions in each gold sentence
+        numSamples - number of bootstrap replicates
+        seed - the replicates are determined by this seed
+        '''
+        self.goldCounts = np.asarray(goldCounts, dtype = float)
+        numSentences = len(self.goldCounts)
+        draws = np.random.RandomState(seed).randint(0, numSentences, size = (numSamples, numSentences))
+        # Number of times each sentence was drawn, per replicate
+        self.weights = np.bincount((draws + np.arange(numSamples)[:, np.newaxis] * numSentences).ravel(),
+                                   minlength = numSamples * numSentences).reshape(numSamples, numSentences)
+
+    def metrics(self, results):
+        ''' AUC and max F1 of each replicate, given a system's (y_true, y_scores, y_sentences) '''
+        return PairedBootstrap.weightedMetrics(results, self.weights, self.goldCounts)
+
+    def compare(self, resultsA, resultsB):
+        ''' Compare the AUC and max F1 of two systems, returns a dictionary from each metric's name to
+            (value of A, value of B, confidence interval of B - A, two sided p-value of B - A).
+            Values are computed on the entire gold, the rest on the replicates. '''
+        [(_, _, ret)] = self.compareAll([('A', resultsA), ('B', resultsB)])
+        return ret
+
+    def compareAll(self, systemResults):
+        ''' Compare each pair of systems, given as (name, results) tuples.
+            Returns a list of (name of A, name of B, comparison), see compare.
+            The replicates of each system are computed only once. '''
+        fullWeights = np.ones((1, len(self.goldCounts)), dtype = np.int64)
+        full = [PairedBootstrap.weightedMetrics(results, fullWeights, self.goldCounts)
+                for _, results in systemResults]
+        replicates = [self.metrics(results) for _, results in systemResults]
+
+        ret = []
+        for i, (nameA, _) in enumerate(systemResults):
+            for j in range(i + 1, len(systemResults)):
+                comparison = {}
+                for m, name in enumerate(PairedBootstrap.METRICS):
+                    comparison[name] = (float(full[i][m][0]), float(full[j][m][0])) + \
+                                       PairedBootstrap.summarize(replicates[j][m] - replicates[i][m])
+                ret.append((nameA, systemResults[j][0], comparison))
+        return ret
+
+    @staticmethod
+    def weightedMetrics(results, weights, goldCounts):
+        ''' AUC and max F1 of a system's results, for each row of sentence weights '''
+        y_true, y_scores, y_sentences = [np.asarray(x) for x in results]
+        # The curve's thresholds are computed once over all predictions, as in PRCurve
+        order = np.argsort(y_scores, kind = 'mergesort')[::-1]
+        scores = y_scores[order]
+        distinct = np.where(np.logical_not(np.isclose(np.diff(scores), 0)))[0]
+        thresholdIndices = np.r_[distinct, len(scores) - 1]
+        correct = y_true[order].astype(bool)
+        sentences = y_sentences[order]
+
+        auc = []
+        f1 = []
+        # Replicates are processed in chunks, each holding a (chunk x predictions) matrix
+        chunkSize = max(1, PairedBootstrap.MAX_CHUNK_CELLS // max(1, len(scores)))
+        for start in range(0, len(weights), chunkSize):
+            chunk = weights[start:start + chunkSize]
+            predWeights = chunk[:, sentences].astype(float)
+            tps = np.cumsum(predWeights * correct, axis = 1)[:, thresholdIndices]
+            counts = np.cumsum(predWeights, axis = 1)[:, thresholdIndices]
+            total = np.dot(chunk, goldCounts)[:, np.newaxis]
+            chunkAuc, chunkF1 = PairedBootstrap.curveMetrics(tps, counts, total)
+            auc.append(chunkAuc)
+            f1.append(chunkF1)
+        return np.concatenate(auc), np.concatenate(f1)
+
+    @staticmethod
+    def curveMetrics(tps, counts, total):
+        ''' AUC and max F1 of curves, one per row, given the (weighted) number of true positives and
+            predictions at each threshold, and the number of gold extractions.
+            Matches PRCurve's truncation at full recall and its ordering of equal recall points. '''
+        numThresholds = tps.shape[1]
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            precision = tps / counts
+            recall = tps / total
+        final = tps[:, -1:]
+        prevTps = np.concatenate([np.zeros((len(tps), 1)), tps[:, :-1]], axis = 1)
+        # Thresholds up to the first which attains full recall
+        valid = prevTps < final
+        # Thresholds at which recall increases, each starting a group of equal recall points
+        isStart = tps > prevTps
+        ks = np.arange(numThresholds)
+        startOf = np.maximum.accumulate(np.where(isStart, ks, -1), axis = 1)
+        nextStart = np.minimum.accumulate(np.where(isStart, ks, numThresholds)[:, ::-1], axis = 1)[:, ::-1]
+        nextStart = np.concatenate([nextStart[:, 1:], np.full((len(tps), 1), numThresholds)], axis = 1)
+
+        # Sorted by recall, each recall increase joins the previous group's highest threshold point
+        # (precision 1 for the zero recall group, which ends with the curve's (1, 0) point),
+        # to the current group's lowest threshold point (only one point of the last group is kept)
+        prevStart = np.concatenate([np.full((len(tps), 1), -1), startOf[:, :-1]], axis = 1)
+        rows = np.arange(len(tps))[:, np.newaxis]
+        prevPrecision = np.where(prevStart >= 0, precision[rows, np.maximum(prevStart, 0)], 1.0)
+        prevRecall = np.concatenate([np.zeros((len(tps), 1)), recall[:, :-1]], axis = 1)
+        end = np.where(tps == final, ks, nextStart - 1)
+        endPrecision = precision[rows, end]
+        areas = np.where(isStart & valid,
+                         (recall - prevRecall) * (prevPrecision + endPrecision) / 2,
+                         0)
+        auc = areas.sum(axis = 1)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+        f1 = np.where(valid & (counts > 0), f1, 0).max(axis = 1)
+        return auc, f1
+
+    @staticmethod
+    def summarize(deltas):
+        ''' (confidence interval, two sided p-value) of the bootstrapped differences.
+            The p-value counts the observed difference as one of the samples, so that it's
+            never 0, which B samples can't show (the smallest p-value is 2 / (B + 1)). '''
+        low, high = np.percentile(deltas, [100 * PairedBootstrap.ALPHA / 2,
+                                           100 * (1 - PairedBootstrap.ALPHA / 2)])
+        tail = min(np.sum(deltas <= 0), np.sum(deltas >= 0))
+        pValue = min(1.0, 2 * (tail + 1) / float(len(deltas) + 1))
+        return (float(low), float(high)), float(pValue)
+
+    # CONSTANTS
+    METRICS = ['auc', 'f1']
+    # Confidence intervals are 1 - ALPHA
+    ALPHA = 0.05
+    # Bounds the memory of each chunk of replicates
+    MAX_CHUNK_CELLS = 1 << 23
@@ -0,0 +1,103 @@
+""" Usage:
+    create_oie_corpus [--qasrl=QASRL_DIR] [--out=OUTPUT_DIR] [--dist=DIST_FILE] [--jobs=JOBS] [--max-combinations=MAX_COMBINATIONS]
+
+    Convert every QA-SRL split (newswire and wiki; dev, train and test) to Open IE on a pool of processes,
+    and concatenate the converted splits into the global dev, train, test and all files.
+
+Options:
+  --qasrl=QASRL_DIR                    Directory of the full QA-SRL corpus [default: ./QASRL-full].
+  --out=OUTPUT_DIR                     Where to create the Open IE corpus [default: ./oie_corpus].
+  --dist=DIST_FILE                     Question distribution file, used to order the arguments [default: ./question_distributions/dist_wh_sbj_obj1.json].
+  --jobs=JOBS                          Number of splits to convert in parallel (defaults to the number of cpus).
+  --max-combinations=MAX_COMBINATIONS  Maximal number of extractions generated per predicate (unbounded by default).
+"""
+from docopt import docopt
+import os
+import shutil
+import logging
+
+from qa_to_oie import Qa2OIE, load_question_dist
+from fork_pool import forkMap
+
+class CorpusBuilder:
+    def __init__(self, qasrl_dir, out_dir, dist_file, max_combinations = None):
+        '''
+        qasrl_dir - directory of the QA-SRL corpus, with a sub directory per domain
+        out_dir - where to create the Open IE corpus
+        dist_file - question distribution, loaded once and shared by all conversions
+        max_combinations - cap on the extractions generated per predicate, see Qa2OIE
+        '''
+        self.qasrl_dir = qasrl_dir
+        self.out_dir = out_dir
+        self.question_dist = load_question_dist(dist_file)
+        self.max_combinations = max_combinations
+
+    def splits(self):
+        ''' (domain, split, QA-SRL filename, Open IE filename) of all splits, in a fixed order '''
+        return [(domain, split,
+                 os.path.join(self.qasrl_dir, domain, '{}.{}.qa'.format(prefix, split)),
+                 os.path.join(self.out_dir, domain, '{}.{}.oie'.format(prefix, split)))
+                for domain, prefix in CorpusBuilder.DOMAINS
+                for split in CorpusBuilder.SPLITS]
+
+    def build(self, numJobs = None):
+        ''' Convert all splits in parallel, then concatenate them.
+            Each split is written to its own file, so the output doesn't depend on scheduling. '''
+        splits = self.splits()
+        for domain, _ in CorpusBuilder.DOMAINS:
+            os.makedirs(os.path.join(self.out_dir, domain), exist_ok = True)
+
+        # Largest files first, so that they don't end up running alone at the end
+        jobs = sorted([(qa_fn, oie_fn, self.max_combinations) for (_, _, qa_fn, oie_fn) in splits],
+                      key = lambda job: os.path.getsize(job[0]),
+                      reverse = True)
+        self.convertSplits(jobs, numJobs)
+
+        for split in CorpusBuilder.SPLITS:
+            concatenate([oie_fn for (_, cur, _, oie_fn) in splits if cur == split],
+                        os.path.join(self.out_dir, '{}.oie'.format(split)))
+        concatenate([os.path.join(self.out_dir, '{}.oie'.format(split)) for split in CorpusBuilder.SPLITS],
+                    os.path.join(self.out_dir, 'all.oie'))
+
+    def convertSplits(self, jobs, numJobs = None):
+        # Every split is converted with the same question distribution, loaded once here rather than per split
+        global _question_dist
+        _question_dist = self.question_dist
+        return forkMap(convertSplit, jobs, numJobs)
+
+    # CONSTANTS
+    # (directory, file prefix) of each domain
+    DOMAINS = [('newswire', 'propbank'),
+               ('wiki', 'wiki1')]
+    SPLITS = ['dev', 'train', 'test']
+
+# Question distribution used by convertSplit, set by CorpusBuilder.convertSplits
+_question_dist = None
+
+def convertSplit(job):
+    ''' Convert a single QA-SRL file. Module level, so that it could be dispatched to a process pool. '''
+    qa_fn, oie_fn, max_combinations = job
+    logging.info("Converting {} to {}".format(qa_fn, oie_fn))
+    Qa2OIE(qa_fn,
+           question_dist = _question_dist,
+           max_combinations = max_combinations).writeOIE(oie_fn)
+    return oie_fn
+
+def concatenate(input_fns, output_fn):
+    with open(output_fn, 'w') as fout:
+        for input_fn in input_fns:
+            with open(input_fn) as fin:
+                shutil.copyfileobj(fin, fout)
+
+
+## MAIN
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.INFO)
+    args = docopt(__doc__)
+    logging.debug(args)
+    CorpusBuilder(qasrl_dir = args['--qasrl'],
+                  out_dir = args['--out'],
+                  dist_file = args['--dist'],
+                  max_combinations = int(args['--max-combinations']) if args['--max-combinations'] else None)\
+                  .build(numJobs = int(args['--jobs']) if args['--jobs'] else None)
+    logging.info("DONE")
@@ -0,0 +1,23 @@
+"""
+Process pool shared by the entry points which run independent jobs in parallel: benchmark.py
+evaluates each system, and create_oie_corpus.py converts each QA-SRL split, in a process of its own.
+"""
+import multiprocessing
+
+def forkMap(func, jobs, numJobs = None):
+    ''' The results of func on each of the jobs, in order, computed on a pool of numJobs processes
+        (defaults to the number of cpus, and at most one per job).
+        The processes are forked, so they inherit the module level state which the caller set up
+        beforehand, rather than having it pickled over. func should thus be module level.
+        A single process runs the jobs in this process instead. '''
+    numJobs = min(numJobs or multiprocessing.cpu_count(), len(jobs))
+    if numJobs <= 1:
+        return list(map(func, jobs))
+
+    pool = multiprocessing.get_context('fork').Pool(numJobs)
+    try:
+        # One job at a time, as jobs are few and their durations vary
+        return pool.map(func, jobs, chunksize = 1)
+    finally:
+        pool.close()
+        pool.join()
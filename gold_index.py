@@ -0,0 +1,141 @@
+"""
+Persistent, precompiled index of a gold Open IE file.
+Parsing the gold and computing the features used by the matcher is the same for
+every evaluation, so it is done once and stored next to the gold file.
+The index is invalidated by the hash of the gold file's content, and of the lemma table
+from which the predicates' lemmas were computed.
+Extractions are only decoded from the index when their sentence is first accessed.
+"""
+import hashlib
+import logging
+import gc
+from collections.abc import Mapping
+
+from oie_readers.goldReader import GoldReader
+from oie_readers.extraction import Extraction
+from matcher import Matcher, lemmatizer
+from pickle_file import readPickle, writePickle
+
+class GoldIndex:
+    ''' Load a gold Open IE file, through an on disk index when possible '''
+    def __init__(self, gold_fn, normalizeKey, index_fn = None):
+        '''
+        gold_fn - the gold Open IE file
+        normalizeKey - function used to normalize sentences into keys
+        index_fn - where to store the index, defaults to gold_fn with an .idx suffix
+        '''
+        self.gold_fn = gold_fn
+        self.normalizeKey = normalizeKey
+        self.index_fn = index_fn or (gold_fn + GoldIndex.SUFFIX)
+
+    def load(self):
+        ''' Returns the gold extractions by sentence, and by normalized key, as LazyGold mappings
+            in file order. Uses the index if it's up to date, otherwise rebuilds it. '''
+        gold_hash = GoldIndex.fileHash(self.gold_fn)
+        lemmas_hash = lemmatizer.digest()
+
+        # Loading allocates many small objects which are all kept alive,
+        # garbage collection passes during the load would only slow it down
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            index = self.readIndex()
+            if index and (index['version'] == GoldIndex.VERSION) and (index['hash'] == gold_hash) and \
+               (index['lemmas'] == lemmas_hash):
+                logging.debug("Loading gold from index {}".format(self.index_fn))
+                return LazyGold.views(index['sentences'])
+        finally:
+            if gcEnabled:
+                gc.enable()
+
+        logging.info("Building gold index {}".format(self.index_fn))
+        gr = GoldReader()
+        gr.read(self.gold_fn)
+        sentences = [(sent, self.normalizeKey(sent), extractions)
+                     for sent, extractions in gr.oie.items()]
+        encoded = GoldIndex.encode(sentences)
+        self.writeIndex({'version': GoldIndex.VERSION,
+                         'hash': gold_hash,
+                         'lemmas': lemmas_hash,
+                         'sentences': encoded})
+        return LazyGold.views(encoded, decoded = dict([(i, extractions)
+                                                       for i, (_, _, extractions) in enumerate(sentences)]))
+
+    def readIndex(self):
+        return readPickle(self.index_fn, "gold index")
+
+    def writeIndex(self, index):
+        writePickle(index, self.index_fn, "gold index")
+
+    @staticmethod
+    def encode(sentences):
+        ''' Plain (picklable) representation of the gold and its precomputed features '''
+        return [(sent, key, [(ex.pred, ex.args, ex.bowWords(), Matcher.predicateLemmas(ex))
+                             for ex in extractions])
+                for sent, key, extractions in sentences]
+
+    @staticmethod
+    def decode(sent, encodedExtractions):
+        ''' The extractions of a sentence, from their encoding '''
+        ret = []
+        for pred, args, bowWords, predLemmas in encodedExtractions:
+            ex = Extraction(pred = pred, sent = sent, confidence = float(1))
+            ex.args = args
+            ex.cachedBowWords = bowWords
+            ex.predLemmas = predLemmas
+            ret.append(ex)
+        return ret
+
+    @staticmethod
+    def fileHash(fn):
+        h = hashlib.sha1()
+        with open(fn, 'rb') as fin:
+            for chunk in iter(lambda: fin.read(GoldIndex.CHUNK_SIZE), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    # CONSTANTS
+    SUFFIX = '.idx'
+    CHUNK_SIZE = 1 << 20
+    # Bump whenever the encoding, the key normalization or the matcher's features change
+    VERSION = 2
+
+
+class LazyGold(Mapping):
+    ''' Read only mapping from sentences (or their keys) to their gold extractions, in file order.
+        Each sentence's extractions are decoded from the index on first access, so that sentences
+        which aren't evaluated are never decoded. '''
+    def __init__(self, keys, sentences, decoded):
+        '''
+        keys - the key of each encoded sentence, later sentences replace earlier ones with the same key
+        sentences - encoded (sentence, normalized key, extractions) tuples, see GoldIndex.encode
+        decoded - extractions decoded so far by position in sentences, shared among views of the same index
+        '''
+        self.positions = dict([(key, i) for i, key in enumerate(keys)])
+        self.sentences = sentences
+        self.decoded = decoded
+
+    @staticmethod
+    def views(sentences, decoded = None):
+        ''' (extractions by sentence, extractions by normalized key) of encoded sentences '''
+        decoded = {} if decoded is None else decoded
+        return (LazyGold([sent for sent, _, _ in sentences], sentences, decoded),
+                LazyGold([key for _, key, _ in sentences], sentences, decoded))
+
+    def __getitem__(self, key):
+        i = self.positions[key]
+        ret = self.decoded.get(i)
+        if ret is None:
+            sent, _, encodedExtractions = self.sentences[i]
+            ret = self.decoded[i] = GoldIndex.decode(sent, encodedExtractions)
+        return ret
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def count(self, key):
+        ''' Number of extractions of a sentence, without decoding them '''
+        return len(self.sentences[self.positions[key]][2])
@@ -0,0 +1,119 @@
+""" Usage:
+    lemma_table --gold=GOLD_OIE --out=OUTPUT_FILE [--manifest=MANIFEST] [--stanford=STANFORD_OIE]... [--ollie=OLLIE_OIE]... [--reverb=REVERB_OIE]... [--clausie=CLAUSIE_OIE]... [--openiefour=OPENIEFOUR_OIE]... [--props=PROPS_OIE]...
+
+    Precompute the lemmas of all predicate words in the gold and in the given system outputs,
+    and store them in a compact word to lemma table, used by the matcher instead of WordNet.
+
+Options:
+  --gold=GOLD_OIE              The gold reference Open IE file.
+  --out=OUTPUT_FILE            Where to write the lemma table.
+  --manifest=MANIFEST          Tab separated file listing system outputs, as accepted by benchmark.py.
+  --clausie=CLAUSIE_OIE        Read ClausIE format from file CLAUSIE_OIE.
+  --ollie=OLLIE_OIE            Read OLLIE format from file OLLIE_OIE.
+  --openiefour=OPENIEFOUR_OIE  Read Open IE 4 format from file OPENIEFOUR_OIE.
+  --props=PROPS_OIE            Read PropS format from file PROPS_OIE
+  --reverb=REVERB_OIE          Read ReVerb format from file REVERB_OIE
+  --stanford=STANFORD_OIE      Read Stanford format from file STANFORD_OIE
+"""
+import os
+import hashlib
+import logging
+from functools import lru_cache
+
+class LemmaTable:
+    ''' Word to lemma lookups, backed by a precomputed table.
+        Falls back to (a memoized) WordNet lemmatizer for words missing from the table. '''
+    def __init__(self, table_fn = None):
+        self.table_fn = table_fn or LemmaTable.DEFAULT_FILENAME
+        self.table = None
+        self.tableDigest = None
+
+    def lemmatize(self, word):
+        if self.table is None:
+            self.table = LemmaTable.readTable(self.table_fn)
+        lemma = self.table.get(word)
+        if lemma is None:
+            return wordnetLemma(word)
+        return lemma
+
+    def digest(self):
+        ''' Hash of the table's content, which identifies the lemmas it gives, for invalidating
+            results computed from them (None if there's no table, and WordNet is used instead) '''
+        if (self.tableDigest is None) and os.path.exists(self.table_fn):
+            with open(self.table_fn, 'rb') as fin:
+                self.tableDigest = hashlib.sha1(fin.read()).hexdigest()
+        return self.tableDigest
+
+    @staticmethod
+    def readTable(fn):
+        ''' Each line holds a word, followed by its lemma if it's different than the word itself '''
+        ret = {}
+        if not os.path.exists(fn):
+            logging.warning("Lemma table {} not found, falling back to WordNet".format(fn))
+            return ret
+        with open(fn) as fin:
+            for line in fin:
+                data = line.rstrip('\n').split('\t')
+                ret[data[0]] = data[-1]
+        return ret
+
+    @staticmethod
+    def writeTable(words, fn):
+        with open(fn, 'w') as fout:
+            for word in sorted(set(words)):
+                lemma = wordnetLemma(word)
+                fout.write('{}\n'.format(word if lemma == word
+                                         else '{}\t{}'.format(word, lemma)))
+
+    # CONSTANTS
+    # Relative to this module, built from the gold corpus and the outputs in systems_output
+    DEFAULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'predicate_lemmas.tsv')
+    # Number of memoized WordNet lookups
+    CACHE_SIZE = 1 << 16
+
+
+_wordnetLemmatizer = None
+
+@lru_cache(maxsize = LemmaTable.CACHE_SIZE)
+def wordnetLemma(word):
+    ''' Lemmatize using WordNet, which is loaded only on the first call '''
+    global _wordnetLemmatizer
+    if _wordnetLemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _wordnetLemmatizer = WordNetLemmatizer()
+    return _wordnetLemmatizer.lemmatize(word)
+
+def predicateWords(oie):
+    ''' All words appearing in predicates of the given extractions dictionary '''
+    return [w
+            for extractions in oie.values()
+            for ex in extractions
+            for w in ex.elementToStr(ex.pred.strip()).split(' ')]
+
+
+## MAIN
+if __name__ == '__main__':
+    from docopt import docopt
+    from oie_readers.goldReader import GoldReader
+    from benchmark import READERS, readManifest
+    logging.basicConfig(level = logging.INFO)
+    args = docopt(__doc__)
+    logging.debug(args)
+
+    gr = GoldReader()
+    gr.read(args['--gold'])
+    words = predicateWords(gr.oie)
+
+    systems = [(fmt, input_fn)
+               for fmt in sorted(READERS)
+               for input_fn in args['--{}'.format(fmt)]]
+    if args['--manifest']:
+        systems += [(fmt, input_fn) for (fmt, input_fn, _) in readManifest(args['--manifest'])]
+
+    for fmt, input_fn in systems:
+        predicted = READERS[fmt]()
+        predicted.read(input_fn)
+        words += predicateWords(predicted.oie)
+
+    logging.info("Writing lemmas of {} predicate words to {}".format(len(set(words)), args['--out']))
+    LemmaTable.writeTable(words, args['--out'])
@@ -0,0 +1,75 @@
+"""
+Persistent cache of per-sentence matching results, for re-evaluating a system whose output mostly
+didn't change. Each sentence's results are keyed by a hash of its gold extractions, its predicted
+extractions, the matching function (along with its thresholds and the lemma table it uses) and the assignment,
+so only sentences whose content changed are matched again.
+Confidences aren't part of the key, since results refer to the predicted extractions by their index.
+"""
+import os
+import hashlib
+
+from matcher import Matcher, lemmatizer
+from pickle_file import readPickle, writePickle
+import profiler
+
+class MatchCache:
+    ''' Matching results of a single system, by sentence key '''
+    def __init__(self, cache_fn):
+        self.cache_fn = cache_fn
+        self.entries = self.readCache()
+        # Entries used by this evaluation, only these are written back
+        self.used = {}
+
+    def get(self, key):
+        ''' The cached results of a sentence (see Benchmark.matchSentence), or None '''
+        ret = self.entries.get(key)
+        if ret is None:
+            profiler.count('cacheMisses')
+        else:
+            profiler.count('cacheHits')
+            self.used[key] = ret
+        return ret
+
+    def put(self, key, results):
+        self.used[key] = results
+
+    def readCache(self):
+        cache = readPickle(self.cache_fn, "match cache")
+        if (cache is None) or (cache.get('version') != MatchCache.VERSION):
+            return {}
+        return cache['entries']
+
+    def save(self):
+        ''' Write the entries of the sentences evaluated this time, dropping the others '''
+        writePickle({'version': MatchCache.VERSION,
+                     'entries': self.used},
+                    self.cache_fn, "match cache")
+
+    @staticmethod
+    def key(matchingFunc, assignment, goldDigest, predictedExtractions):
+        ''' Key of a sentence's results, given the digest of its gold extractions '''
+        h = hashlib.sha1()
+        h.update(repr((MatchCache.matcherSignature(matchingFunc), assignment, goldDigest)).encode('utf8'))
+        h.update(MatchCache.digest(predictedExtractions))
+        return h.digest()
+
+    @staticmethod
+    def digest(extractions):
+        ''' Hash of the content of extractions (ignoring their confidence), in order '''
+        return hashlib.sha1(repr([(ex.pred, ex.args, ex.splits_conjunctions)
+                                  for ex in extractions]).encode('utf8')).digest()
+
+    @staticmethod
+    def matcherSignature(matchingFunc):
+        ''' Identifies the matching function, and the thresholds and predicate lemmas which determine its results '''
+        return (matchingFunc.__qualname__, Matcher.LEXICAL_THRESHOLD, Matcher.BLEU_THRESHOLD, lemmatizer.digest())
+
+    @staticmethod
+    def cacheFilename(output_fn):
+        ''' Cache of a system, stored next to its PR curve '''
+        return '{}{}'.format(os.path.splitext(output_fn)[0], MatchCache.SUFFIX)
+
+    # CONSTANTS
+    SUFFIX = '.matches'
+    # Bump whenever matching or the key's contents change
+    VERSION = 3
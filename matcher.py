@@ -1,49 +1,132 @@
+import sys
+import math
 import string
-import nltk
-from nltk.translate.bleu_score import sentence_bleu
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from collections import Counter
+import numpy as np
+from lemma_table import LemmaTable
+import profiler
 
-nltk.download('wordnet', quiet=True)
-lemmatizer = WordNetLemmatizer() 
+# Precomputed lemmas, WordNet is only consulted for words missing from the table
+lemmatizer = LemmaTable()
 
 class Matcher:
     @staticmethod
     def bowMatch(ref, ex, ignoreStopwords, ignoreCase):
-        s1 = ref.bow()
-        s2 = ex.bow()
-        if ignoreCase:
-            s1 = s1.lower()
-            s2 = s2.lower()
-        
-        s1Words = s1.split(' ')
-        s2Words = s2.split(' ')
-        
-        if ignoreStopwords:
-            s1Words = Matcher.removeStopwords(s1Words)
-            s2Words = Matcher.removeStopwords(s2Words)
-            
-        return sorted(s1Words) == sorted(s2Words)
-    
+        profiler.count('matcherCalls')
+        return Matcher.bowSignature(ref, ignoreStopwords, ignoreCase) == \
+            Matcher.bowSignature(ex, ignoreStopwords, ignoreCase)
+
+    @staticmethod
+    def bowSignature(ex, ignoreStopwords, ignoreCase):
+        ''' The multiset of words compared by bowMatch, as a sorted tuple,
+            computed once per extraction (and options) '''
+        options = (ignoreStopwords, ignoreCase)
+        if options not in ex.bowSignatures:
+            s = ex.bow()
+            if ignoreCase:
+                s = s.lower()
+            words = s.split(' ')
+            if ignoreStopwords:
+                words = Matcher.removeStopwords(words)
+            ex.bowSignatures[options] = tuple(sorted(words))
+        return ex.bowSignatures[options]
+
     @staticmethod
     def bleuMatch(ref, ex, ignoreStopwords, ignoreCase):
+        return Matcher.bleuScore(ref, ex) > Matcher.BLEU_THRESHOLD
+
+    @staticmethod
+    def bleuScore(ref, ex):
+        ''' BLEU of the extraction's words against the reference's, as thresholded by bleuMatch '''
+        from nltk.translate.bleu_score import sentence_bleu
+        profiler.count('matcherCalls')
         sRef = ref.bow()
         sEx = ex.bow()
-        bleu = sentence_bleu(references = [sRef.split(' ')], hypothesis = sEx.split(' '))
-        return bleu > Matcher.BLEU_THRESHOLD
+        return sentence_bleu(references = [sRef.split(' ')], hypothesis = sEx.split(' '))
+
+    @staticmethod
+    def bleuScoreMatrix(refs, exs):
+        ''' len(refs) x len(exs) matrix of bleuScore '''
+        return np.array([[Matcher.bleuScore(ref, ex) for ex in exs] for ref in refs],
+                        dtype = float).reshape(len(refs), len(exs))
     
+    @staticmethod
+    def fastBleuMatch(ref, ex, ignoreStopwords, ignoreCase):
+        ''' Same as bleuMatch, without calling NLTK (see fastBleuScore) '''
+        return Matcher.fastBleuScore(ref, ex) > Matcher.BLEU_THRESHOLD
+
+    @staticmethod
+    def fastBleuScore(ref, ex):
+        ''' bleuScore (i.e., NLTK's sentence_bleu with its default weights and without smoothing),
+            computed from the n-gram counts of each extraction, which are extracted only once.
+            As in NLTK, precisions without any matching n-grams count as the smallest float. '''
+        profiler.count('matcherCalls')
+        refCounts = Matcher.ngramCounts(ref)
+        exCounts = Matcher.ngramCounts(ex)
+        logPrecisions = []
+        for n, (refNgrams, exNgrams) in enumerate(zip(refCounts, exCounts)):
+            clipped = sum([min(exNgrams[ngram], refNgrams[ngram]) for ngram in exNgrams.keys() & refNgrams.keys()])
+            if not clipped:
+                if n == 0:
+                    # No matching words
+                    return 0.0
+                logPrecisions.append(Matcher.BLEU_ZERO_LOG)
+            else:
+                logPrecisions.append(math.log(clipped / max(1, sum(exNgrams.values()))))
+        refLength = len(ref.bowWords())
+        exLength = len(ex.bowWords())
+        if exLength > refLength:
+            penalty = 1
+        else:
+            penalty = math.exp(1 - refLength / exLength)
+        return penalty * math.exp(math.fsum([weight * logPrecision
+                                             for weight, logPrecision in zip(Matcher.BLEU_WEIGHTS, logPrecisions)]))
+
+    @staticmethod
+    def fastBleuScoreMatrix(refs, exs):
+        ''' len(refs) x len(exs) matrix of fastBleuScore, computing the clipped n-gram
+            counts of all pairs at once (see clippedCounts) '''
+        profiler.count('matcherCalls', len(refs) * len(exs))
+        refLengths = np.array([len(ref.bowWords()) for ref in refs], dtype = float)[:, np.newaxis]
+        exLengths = np.array([len(ex.bowWords()) for ex in exs], dtype = float)[np.newaxis, :]
+        logPrecisions = np.zeros((len(refs), len(exs)))
+        for n, weight in enumerate(Matcher.BLEU_WEIGHTS):
+            refNgrams = Matcher.ragged([Matcher.ngramIds(ref)[n] for ref in refs])
+            exNgrams = Matcher.ragged([Matcher.ngramIds(ex)[n] for ex in exs])
+            clipped = Matcher.clippedCounts(refNgrams, exNgrams)
+            if n == 0:
+                found = clipped > 0
+            with np.errstate(divide = 'ignore'):
+                logPrecision = np.log(clipped / np.maximum(exNgrams[1], 1)[np.newaxis, :])
+            logPrecisions += weight * np.where(clipped > 0, logPrecision, Matcher.BLEU_ZERO_LOG)
+        penalty = np.where(exLengths > refLengths, 1.0, np.exp(1 - refLengths / exLengths))
+        return np.where(found, penalty * np.exp(logPrecisions), 0.0)
+
+    @staticmethod
+    def fastBleuMatchMatrix(refs, exs, ignoreStopwords, ignoreCase):
+        ''' Batched version of fastBleuMatch '''
+        return Matcher.fastBleuScoreMatrix(refs, exs) > Matcher.BLEU_THRESHOLD
+
     @staticmethod
     def lexicalMatch(ref, ex, ignoreStopwords, ignoreCase):
-        sRef = ref.bow().split(' ')
-        sEx = ex.bow().split(' ')
+        return Matcher.lexicalScore(ref, ex) > Matcher.LEXICAL_THRESHOLD
+
+    @staticmethod
+    def lexicalScore(ref, ex):
+        ''' Coverage of the reference's words by the extraction, as thresholded by lexicalMatch,
+            or -inf if their predicates don't share a lemma '''
+        profiler.count('matcherCalls')
+        sRef = ref.bowWords()
+        sEx = ex.bowWords()
         count = 0
-        gold_predicate_words = [lemmatizer.lemmatize(w) for w in ref.elementToStr(ref.pred.strip()).split(' ')]
-        ex_predicate_words = [lemmatizer.lemmatize(w) for w in ex.elementToStr(ex.pred.strip()).split(' ')]
+        gold_predicate_words = Matcher.predicateLemmas(ref)
+        ex_predicate_words = Matcher.predicateLemmas(ex)
 
         # Make sure the predicates, at the very least, match before 
         # seeing if the doing the lexical match
-        if not bool(set(ex_predicate_words) & set(gold_predicate_words)):
-            return False
+        if not bool(ex_predicate_words & gold_predicate_words):
+            return -np.inf
+        profiler.count('predicateMatches')
 
         for w1 in sRef:
             for w2 in sEx:
@@ -55,17 +138,349 @@ class Matcher:
         #       being too long
         coverage = float(count) / len(sRef)
 
-        
-        return coverage > Matcher.LEXICAL_THRESHOLD
+        return coverage
+
+    @staticmethod
+    def lexicalScoreMatrix(refs, exs):
+        ''' len(refs) x len(exs) matrix of the coverage thresholded by lexicalMatch,
+            which is -inf for pairs whose predicates don't share a lemma '''
+        return Matcher.lexicalScoreBlocks(Matcher.ragged([Matcher.tokenIds(ref) for ref in refs]),
+                                          Matcher.ragged([Matcher.predicateLemmaIds(ref) for ref in refs]),
+                                          Matcher.ragged([Matcher.tokenIds(ex) for ex in exs]),
+                                          Matcher.ragged([Matcher.predicateLemmaIds(ex) for ex in exs]))
     
+    @staticmethod
+    def lexicalMatchMatrix(refs, exs, ignoreStopwords, ignoreCase):
+        ''' Batched version of lexicalMatch, returns a boolean len(refs) x len(exs)
+            matrix whose (i, j) cell is lexicalMatch(refs[i], exs[j]). '''
+        return Matcher.lexicalMatchBlocks(Matcher.ragged([Matcher.tokenIds(ref) for ref in refs]),
+                                          Matcher.ragged([Matcher.predicateLemmaIds(ref) for ref in refs]),
+                                          Matcher.ragged([Matcher.tokenIds(ex) for ex in exs]),
+                                          Matcher.ragged([Matcher.predicateLemmaIds(ex) for ex in exs]))
+
+    @staticmethod
+    def lexicalMatchBlocks(refTokens, refLemmas, exTokens, exLemmas):
+        ''' lexicalMatch over blocks of encoded extractions, where each argument is a ragged
+            (ids, lengths) tuple holding either the extractions' tokens or their predicate lemmas. '''
+        return Matcher.lexicalScoreBlocks(refTokens, refLemmas, exTokens, exLemmas) > Matcher.LEXICAL_THRESHOLD
+
+    @staticmethod
+    def lexicalScoreBlocks(refTokens, refLemmas, exTokens, exLemmas):
+        ''' Coverage matrix (see lexicalScoreMatrix) over blocks of encoded extractions.
+            Tokens and predicate lemmas are encoded as integer ids, so that all of the
+            overlaps are computed by two matrix products. '''
+        # Predicates must share at least one lemma
+        predicateMask = Matcher.overlapCounts(refLemmas, exLemmas) > 0
+        # Only the pairs passing the predicate check are scored, the others are pruned
+        # (and counted as such by candidates, or by callers which score whole blocks)
+        scored = predicateMask.sum()
+        profiler.count('matcherCalls', scored)
+        profiler.count('predicateMatches', scored)
+
+        # Number of (reference word, extraction word) equal pairs, as counted by lexicalMatch
+        counts = Matcher.overlapCounts(refTokens, exTokens)
+        coverage = counts / refTokens[1].astype(float)[:, np.newaxis]
+
+        return np.where(predicateMask, coverage, -np.inf)
+
+    @staticmethod
+    def firstMatches(matchingFunc, refs, exs, ignoreStopwords, ignoreCase):
+        ''' For each reference, the index of the first extraction in exs which it matches
+            according to matchingFunc (or None if there's no such extraction).
+            For matching functions which require the predicates to share a lemma, only
+            extractions found through a predicate lemma index are considered.
+            Computed in bulk if matchingFunc has a batched version and there are enough
+            candidate pairs, fewer pairs are cheaper to check one by one. '''
+        candidates = Matcher.candidates(matchingFunc, refs, exs, ignoreStopwords, ignoreCase)
+        if (matchingFunc in Matcher.BATCHED) and \
+           (sum(map(len, candidates)) >= Matcher.MIN_BATCH_PAIRS):
+            # Compute the block of all candidate columns at once
+            cols = sorted(set().union(*candidates))
+            matches = Matcher.BATCHED[matchingFunc](refs, [exs[j] for j in cols],
+                                                    ignoreStopwords = ignoreStopwords,
+                                                    ignoreCase = ignoreCase)
+            found = matches.any(axis = 1)
+            return [cols[k] if f else None
+                    for k, f in zip(matches.argmax(axis = 1), found)]
+
+        return [next((j for j in refCandidates
+                      if matchingFunc(ref, exs[j],
+                                      ignoreStopwords = ignoreStopwords,
+                                      ignoreCase = ignoreCase)),
+                     None)
+                for ref, refCandidates in zip(refs, candidates)]
+
+    @staticmethod
+    def candidates(matchingFunc, refs, exs, ignoreStopwords, ignoreCase):
+        ''' For each reference, the (ascending) indices of the extractions in exs which it may match.
+            For matching functions which require the predicates to share a lemma, only
+            extractions found through a predicate lemma index are considered.
+            For matching functions which compare a signature of each extraction (see SIGNATURES),
+            these are the extractions with the reference's signature, found by a hash join. '''
+        if matchingFunc in Matcher.SIGNATURES:
+            signature = Matcher.SIGNATURES[matchingFunc]
+            index = {}
+            for j, ex in enumerate(exs):
+                index.setdefault(signature(ex, ignoreStopwords, ignoreCase), []).append(j)
+            ret = [index.get(signature(ref, ignoreStopwords, ignoreCase), [])
+                   for ref in refs]
+        elif matchingFunc in Matcher.PREDICATE_LEMMA_MATCHERS:
+            index = Matcher.predicateIndex(exs)
+            ret = [sorted(set([j
+                               for lemma in Matcher.predicateLemmas(ref)
+                               for j in index.get(lemma, [])]))
+                   for ref in refs]
+        else:
+            return [range(len(exs))] * len(refs)
+        profiler.count('pairsPruned', len(refs) * len(exs) - sum(map(len, ret)))
+        return ret
+
+    @staticmethod
+    def firstMatchesAbove(scores, threshold):
+        ''' Same as firstMatches, given the matrix of all of the (reference, extraction) scores
+            of a matching function which matches pairs scoring above threshold (see SCORERS) '''
+        matches = scores > threshold
+        return [int(j) if found else None
+                for j, found in zip(matches.argmax(axis = 1), matches.any(axis = 1))]
+
+    @staticmethod
+    def optimalMatches(matchingFunc, refs, exs, ignoreStopwords, ignoreCase):
+        ''' For each reference, the index of the extraction assigned to it by a one-to-one matching between
+            refs and exs (or None if it isn't assigned a matching extraction), which matches as many references
+            as possible and, among such matchings, has the maximum total score (for matching functions which
+            threshold one, see SCORERS).
+            Only the columns of candidate extractions (see candidates) are scored, in bulk if there are
+            enough candidate pairs, as in firstMatches. '''
+        candidates = Matcher.candidates(matchingFunc, refs, exs, ignoreStopwords, ignoreCase)
+        cols = sorted(set().union(*candidates))
+        if not cols:
+            return [None] * len(refs)
+
+        if matchingFunc in Matcher.SCORERS:
+            scoreMatrix, threshold = Matcher.SCORERS[matchingFunc]
+            threshold = getattr(Matcher, threshold)
+            pairScore = Matcher.PAIR_SCORERS[matchingFunc]
+        else:
+            scoreMatrix = None
+            # Matches score 1, and mismatches 0
+            threshold = 0
+            pairScore = lambda ref, ex: matchingFunc(ref, ex,
+                                                     ignoreStopwords = ignoreStopwords,
+                                                     ignoreCase = ignoreCase)
+
+        if (scoreMatrix is not None) and \
+           (sum(map(len, candidates)) >= Matcher.MIN_BATCH_PAIRS):
+            scores = scoreMatrix(refs, [exs[j] for j in cols])
+        else:
+            column = dict([(j, k) for k, j in enumerate(cols)])
+            scores = np.full((len(refs), len(cols)), -np.inf)
+            for i, (ref, refCandidates) in enumerate(zip(refs, candidates)):
+                for j in refCandidates:
+                    scores[i, column[j]] = pairScore(ref, exs[j])
+        return [None if match is None else cols[match]
+                for match in Matcher.optimalMatchesAbove(scores, threshold)]
+
+    @staticmethod
+    def optimalMatchesAbove(scores, threshold):
+        ''' Same as optimalMatches, given the matrix of all of the (reference, extraction) scores
+            of a matching function which matches pairs scoring above threshold.
+            Each matching pair is weighted by its score plus a bonus exceeding the sum of all scores,
+            so that the maximum weight assignment never trades a match for a higher total score.
+            The assignment is only solved over the rows and columns which have a matching pair,
+            which are usually a small part of the sentence's extractions. '''
+        matches = scores > threshold
+        if (matches.sum(axis = 0) <= 1).all():
+            # No extraction is contested, so each reference takes its best match
+            best = np.where(matches, scores, -np.inf).argmax(axis = 1)
+            return [int(j) if found else None
+                    for j, found in zip(best, matches.any(axis = 1))]
+
+        from scipy.optimize import linear_sum_assignment
+        rows = np.flatnonzero(matches.any(axis = 1))
+        cols = np.flatnonzero(matches.any(axis = 0))
+        ret = [None] * len(scores)
+        bonus = np.abs(scores[matches]).sum() + 1
+        weights = np.where(matches, scores + bonus, 0)[np.ix_(rows, cols)]
+        # Negated, since linear_sum_assignment minimizes the cost (maximize needs scipy>=1.4)
+        for i, j in zip(*linear_sum_assignment(-weights)):
+            # Rows without a matching column can still be assigned one
+            if matches[rows[i], cols[j]]:
+                ret[rows[i]] = int(cols[j])
+        return ret
+
+    @staticmethod
+    def predicateIndex(exs):
+        ''' Inverted index from predicate lemmas to the (ascending) indices
+            of the extractions in which they appear '''
+        ret = {}
+        for j, ex in enumerate(exs):
+            for lemma in Matcher.predicateLemmas(ex):
+                ret.setdefault(lemma, []).append(j)
+        return ret
+
+    @staticmethod
+    def overlapCounts(refIds, exIds):
+        ''' Given two ragged (ids, lengths) blocks, returns a len(refs) x len(exs) matrix,
+            counting the equal (ref id, ex id) pairs for each combination.
+            Only ids appearing on the reference side can contribute to the count,
+            so both sides are represented as counts over this (small) vocabulary. '''
+        vocab = np.unique(refIds[0])
+        return np.dot(Matcher.countMatrix(refIds, vocab),
+                      Matcher.countMatrix(exIds, vocab).T)
+
+    @staticmethod
+    def clippedCounts(refIds, exIds):
+        ''' Same as overlapCounts, but counting each id only as many times as it appears on both
+            sides (i.e., the size of the intersection of their multisets, as BLEU's clipped counts).
+            As counts are small, min(a, b) is computed as the number of k >= 1 such that
+            a >= k and b >= k, by a matrix product for each k. '''
+        ret = np.zeros((len(refIds[1]), len(exIds[1])))
+        vocab = np.unique(refIds[0])
+        if not len(vocab):
+            return ret
+        refCounts = Matcher.countMatrix(refIds, vocab)
+        exCounts = Matcher.countMatrix(exIds, vocab)
+        for k in range(1, int(min(refCounts.max(), exCounts.max())) + 1):
+            ret += np.dot((refCounts >= k).astype(float),
+                          (exCounts >= k).astype(float).T)
+        return ret
+
+    @staticmethod
+    def countMatrix(block, vocab):
+        ''' Rows of id counts over a sorted vocabulary, ids outside of it are ignored.
+            Stored as floats, as counts are small and float matrix products are much faster. '''
+        ids, lengths = block
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        cols = np.minimum(np.searchsorted(vocab, ids), len(vocab) - 1)
+        found = (vocab[cols] == ids)
+        return np.bincount(rows[found] * len(vocab) + cols[found],
+                           minlength = len(lengths) * len(vocab)).reshape(len(lengths), len(vocab)).astype(float)
+
+    @staticmethod
+    def ragged(idArrays):
+        ''' Pack a list of id arrays into a single (ids, lengths) tuple '''
+        return (np.concatenate(idArrays),
+                np.array([len(x) for x in idArrays], dtype = np.int64))
+
+    @staticmethod
+    def tokenIds(ex):
+        ''' Extraction's bowWords as an array of integer ids, computed once per extraction '''
+        if ex.tokenIds is None:
+            ex.tokenIds = Matcher.encode(ex.bowWords())
+        return ex.tokenIds
+
+    @staticmethod
+    def predicateLemmaIds(ex):
+        ''' Extraction's predicateLemmas as an array of integer ids, computed once per extraction '''
+        if ex.predLemmaIds is None:
+            ex.predLemmaIds = Matcher.encode(Matcher.predicateLemmas(ex))
+        return ex.predLemmaIds
+
+    @staticmethod
+    def ngrams(ex, n):
+        ''' The extraction's bowWords n-grams, as tuples '''
+        words = ex.bowWords()
+        return zip(*[words[i:] for i in range(n)])
+
+    @staticmethod
+    def ngramIds(ex):
+        ''' Ids of the extraction's n-grams, as an array for each order of BLEU_WEIGHTS,
+            computed once per extraction '''
+        if ex.ngramIds is None:
+            ex.ngramIds = [np.array([Matcher.ngramVocab.setdefault(ngram, len(Matcher.ngramVocab))
+                                     for ngram in Matcher.ngrams(ex, n)],
+                                    dtype = np.int64)
+                           for n in range(1, len(Matcher.BLEU_WEIGHTS) + 1)]
+        return ex.ngramIds
+
+    @staticmethod
+    def ngramCounts(ex):
+        ''' Counts of the extraction's n-grams of each order of BLEU_WEIGHTS, computed once per extraction '''
+        if ex.ngramCounts is None:
+            ex.ngramCounts = [Counter(Matcher.ngrams(ex, n))
+                              for n in range(1, len(Matcher.BLEU_WEIGHTS) + 1)]
+        return ex.ngramCounts
+
+    @staticmethod
+    def encode(words):
+        ''' Map words to integer ids, shared across all extractions '''
+        return np.array([Matcher.vocab.setdefault(w, len(Matcher.vocab)) for w in words],
+                        dtype = np.int64)
+
+    @staticmethod
+    def lemmaIdsOf(wordIds):
+        ''' Map an array of word ids to the ids of their lemmas.
+            Each word is lemmatized once, and then looked up in Matcher.lemmaOf '''
+        if len(Matcher.lemmaOf) < len(Matcher.vocab):
+            Matcher.lemmaOf = np.concatenate([Matcher.lemmaOf,
+                                              np.full(len(Matcher.vocab) - len(Matcher.lemmaOf), -1, dtype = np.int64)])
+        missing = np.unique(wordIds[Matcher.lemmaOf[wordIds] < 0])
+        if len(missing):
+            # Maps ids back to words
+            words = dict([(i, w) for w, i in Matcher.vocab.items()])
+            for i in missing:
+                Matcher.lemmaOf[i] = Matcher.vocab.setdefault(lemmatizer.lemmatize(words[i]),
+                                                              len(Matcher.vocab))
+        return Matcher.lemmaOf[wordIds]
+
+    @staticmethod
+    def predicateLemmas(ex):
+        ''' Set of lemmatized predicate words, computed once per extraction '''
+        if ex.predLemmas is None:
+            ex.predLemmas = set([lemmatizer.lemmatize(w) for w in ex.elementToStr(ex.pred.strip()).split(' ')])
+        return ex.predLemmas
+
     @staticmethod
     def removeStopwords(ls):
-        return [w for w in ls if w.lower() not in Matcher.stopwords]
+        stopwords = Matcher.stopwordSet()
+        return [w for w in ls if w.lower() not in stopwords]
+
+    @staticmethod
+    def stopwordSet():
+        ''' NLTK's English stopwords and punctuation, loaded on first use '''
+        if Matcher.stopwords is None:
+            from nltk.corpus import stopwords
+            Matcher.stopwords = frozenset(stopwords.words('english') + list(string.punctuation))
+        return Matcher.stopwords
     
     # CONSTANTS
     BLEU_THRESHOLD = 0.4
-    LEXICAL_THRESHOLD = 0.25 # Note: changing this value didn't change the ordering of the tested systems
-    stopwords = stopwords.words('english') + list(string.punctuation)
+    # NLTK's default n-gram weights, used by fastBleuScore
+    BLEU_WEIGHTS = (0.25, 0.25, 0.25, 0.25)
+    # Log precision of n-gram orders without any match, as in NLTK's unsmoothed BLEU
+    BLEU_ZERO_LOG = math.log(sys.float_info.min)
+    LEXICAL_THRESHOLD = 0.25 # Note: changing this value didn't change the ordering of the tested systems (see benchmark.py --sweep)
+    # Loaded by stopwordSet
+    stopwords = None
+    # Word to integer id mapping, used by the batched matchers
+    vocab = {}
+    # N-gram (tuple of words) to integer id mapping, used by fastBleuScore
+    ngramVocab = {}
+    # Word id to lemma id, filled by lemmaIdsOf (-1 for words not lemmatized yet)
+    lemmaOf = np.zeros(0, dtype = np.int64)
+    # Blocks with fewer (reference, extraction) pairs are matched pair by pair
+    MIN_BATCH_PAIRS = 250
+
+# Batched versions of the matching functions, used by Matcher.firstMatches
+Matcher.BATCHED = {Matcher.lexicalMatch: Matcher.lexicalMatchMatrix,
+                   Matcher.fastBleuMatch: Matcher.fastBleuMatchMatrix}
+# Score matrices of the matching functions which threshold a score, along with the name of their threshold
+Matcher.SCORERS = {Matcher.lexicalMatch: (Matcher.lexicalScoreMatrix, 'LEXICAL_THRESHOLD'),
+                   Matcher.bleuMatch: (Matcher.bleuScoreMatrix, 'BLEU_THRESHOLD'),
+                   Matcher.fastBleuMatch: (Matcher.fastBleuScoreMatrix, 'BLEU_THRESHOLD')}
+# Scores of a single pair of extractions, thresholded by the matching functions of SCORERS
+Matcher.PAIR_SCORERS = {Matcher.lexicalMatch: Matcher.lexicalScore,
+                        Matcher.bleuMatch: Matcher.bleuScore,
+                        Matcher.fastBleuMatch: Matcher.fastBleuScore}
+# Assignments of predicted extractions to references, as functions of (matchingFunc, refs, exs, ignoreStopwords,
+# ignoreCase), along with the same function given a matrix of the references' scores and the threshold above which they match.
+# Greedy assignment takes the first matching extraction of each reference, and may assign it to several references.
+Matcher.ASSIGNMENTS = {'greedy': (Matcher.firstMatches, Matcher.firstMatchesAbove),
+                       'optimal': (Matcher.optimalMatches, Matcher.optimalMatchesAbove)}
+# Matching functions which match extractions with equal signatures, along with the function computing them
+Matcher.SIGNATURES = {Matcher.bowMatch: Matcher.bowSignature}
+# Matching functions which never match extractions whose predicates don't share a lemma
+Matcher.PREDICATE_LEMMA_MATCHERS = set([Matcher.lexicalMatch])
 
 
 
@@ -1,14 +1,21 @@
-import nltk
-from operator import itemgetter
+from oie_readers.posTagger import posTagger
 
 class Argument:
-    def __init__(self, arg):
+    def __init__(self, arg, sent = None):
         self.words = [x for x in arg[0].strip().split(' ') if x]
-        self.posTags = list(map(itemgetter(1), nltk.pos_tag(self.words)))
+        self.sent = sent
+        # Tagged lazily (see posTags), along with the rest of the sentence's arguments
+        self.cachedPosTags = None
+        if sent is not None:
+            posTagger.register(sent, self.words)
         self.indices = arg[1]
         self.feats = {}
+
+    @property
+    def posTags(self):
+        if self.cachedPosTags is None:
+            self.cachedPosTags = posTagger.tag(self.words, self.sent)
+        return self.cachedPosTags
         
         
 COREF = 'coref'
-
-itemgetter
\ No newline at end of file
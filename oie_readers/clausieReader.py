@@ -6,8 +6,10 @@ class ClausieReader(OieReader):
     def __init__(self):
         self.name = 'ClausIE'
     
-    def read(self, fn):
-        d = {}
+    def iterExtractions(self, fn):
+        return self.normalizedExtractions(lambda: self.parse(fn))
+
+    def parse(self, fn):
         with open(fn) as fin:
             for line in fin:
                 data = line.strip().split('\t')
@@ -20,21 +22,4 @@ class ClausieReader(OieReader):
                     curExtraction = Extraction(pred = rel, sent = text, confidence = float(confidence))
                     curExtraction.addArg(arg1)
                     curExtraction.addArg(arg2)
-                    d[text] = d.get(text, []) + [curExtraction]
-        self.oie = d
-        self.normalizeConfidence()
-    
-    
-    def normalizeConfidence(self):
-        ''' Normalize confidence to resemble probabilities '''        
-        EPSILON = 1e-3
-        
-        confidences = [extraction.confidence for sent in self.oie for extraction in self.oie[sent]]
-        maxConfidence = max(confidences)
-        minConfidence = min(confidences)
-        
-        denom = maxConfidence - minConfidence + (2*EPSILON)
-        
-        for sent, extractions in list(self.oie.items()):
-            for extraction in extractions:
-                extraction.confidence = ( (extraction.confidence - minConfidence) + EPSILON) / denom
+                    yield curExtraction
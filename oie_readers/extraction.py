@@ -1,8 +1,7 @@
-from sklearn.preprocessing.data import binarize
 from oie_readers.argument import Argument
+from oie_readers.posTagger import posTagger, tokenize
 from operator import itemgetter
 from collections import defaultdict
-import nltk
 import logging
 
 class Extraction:
@@ -18,6 +17,15 @@ class Extraction:
         self.is_mwp = False
         self.question_dist = question_dist
         self.splits_conjunctions = splits_conjunctions
+        # Lazily computed by bowWords and the Matcher
+        self.cachedBowWords = None
+        self.predLemmas = None
+        self.tokenIds = None
+        self.predLemmaIds = None
+        self.ngramIds = None
+        self.ngramCounts = None
+        # bowMatch's signatures, by its options
+        self.bowSignatures = {}
 
     def distArgFromPred(self, arg):
         assert(len(self.pred) == 2)
@@ -33,21 +41,31 @@ class Extraction:
 
     def addArg(self, arg, question = None):
         self.args.append(arg)
+        self.cachedBowWords = None
+        self.tokenIds = None
+        self.ngramIds = None
+        self.ngramCounts = None
+        self.bowSignatures = {}
         if question:
-            self.questions[question] = self.questions.get(question,[]) + [Argument(arg)]
+            self.questions[question] = self.questions.get(question,[]) + [Argument(arg, self.sent)]
 
     def noPronounArgs(self):
         """
         Returns True iff all of this extraction's arguments are not pronouns.
         """
         for (a, _) in self.args:
-            tokenized_arg = nltk.word_tokenize(a)
+            tokenized_arg = tokenize(a)
             if len(tokenized_arg) == 1:
-                _, pos_tag = nltk.pos_tag(tokenized_arg)[0]
-                if ('PRP' in pos_tag):
+                if posTagger.isPronoun(tokenized_arg[0], self.sent):
                     return False
         return True
 
+    def singleWordArgs(self):
+        ''' Arguments which consist of a single token, these are checked by noPronounArgs '''
+        return [tokenized_arg[0]
+                for tokenized_arg in [tokenize(a) for (a, _) in self.args]
+                if len(tokenized_arg) == 1]
+
     def isContiguous(self):
         return all([indices for (_, indices) in self.args])
 
@@ -105,6 +123,12 @@ class Extraction:
     def bow(self):
         return ' '.join([self.elementToStr(elem) for elem in [self.pred] + self.args])
 
+    def bowWords(self):
+        ''' bow() split into words, cached as it's used repeatedly when matching '''
+        if self.cachedBowWords is None:
+            self.cachedBowWords = self.bow().split(' ')
+        return self.cachedBowWords
+
     def getSortedArgs(self):
         """
         Sort the list of arguments.
@@ -300,6 +324,16 @@ def normalize_element(elem):
            else ""
 
 ## Helper functions
+def filter_pronoun_args(extractions):
+    """
+    Returns the extractions whose arguments are not pronouns (see noPronounArgs).
+    All single word arguments are POS tagged in a single batch.
+    """
+    posTagger.tagBatch([(word,)
+                        for ex in extractions
+                        for word in ex.singleWordArgs()])
+    return [ex for ex in extractions if ex.noPronounArgs()]
+
 def escape_special_chars(s):
     return s.replace('\t', '\\t')
 
@@ -0,0 +1,99 @@
+from array import array
+import numpy as np
+
+class ExtractionStore:
+    ''' Columnar storage of extractions, as an alternative to holding an Extraction per prediction.
+    After finalize is called, the following arrays are available (N = number of extractions):
+    confidence         - float [N]
+    sentenceIds        - int [N], index into sentences
+    splitsConjunctions - bool [N]
+    matched            - bool [N], set when evaluating
+    tokens             - int, word ids of all extraction elements (predicate first, then arguments),
+                         as split by Extraction.bow
+    elementOffsets     - int, start of each element in tokens (with a trailing end offset)
+    extractionElements - int [N + 1], start of each extraction's elements in elementOffsets
+    predWords          - int, word ids of each stripped predicate, as lemmatized by the matcher
+    predWordOffsets    - int [N + 1], start of each extraction's predicate words in predWords '''
+    def __init__(self, vocab = None):
+        ''' vocab - word to id dictionary, shared with (and extended by) this store '''
+        self.vocab = {} if vocab is None else vocab
+        self.sentences = []
+        self.sentenceIndex = {}
+        self.columns = dict([(name, array(typecode)) for name, typecode, _ in ExtractionStore.COLUMNS])
+        self.columns['extractionElements'].append(0)
+        self.columns['predWordOffsets'].append(0)
+
+    def add(self, extraction):
+        sentenceId = self.sentenceIndex.get(extraction.sent)
+        if sentenceId is None:
+            sentenceId = self.sentenceIndex[extraction.sent] = len(self.sentences)
+            self.sentences.append(extraction.sent)
+
+        cols = self.columns
+        cols['confidence'].append(extraction.confidence)
+        cols['sentenceIds'].append(sentenceId)
+        cols['splitsConjunctions'].append(extraction.splits_conjunctions)
+        for elem in [extraction.pred] + extraction.args:
+            cols['elementOffsets'].append(len(cols['tokens']))
+            cols['tokens'].extend(self.encode(extraction.elementToStr(elem).split(' ')))
+        cols['extractionElements'].append(len(cols['elementOffsets']))
+        cols['predWords'].extend(self.encode(extraction.elementToStr(extraction.pred.strip()).split(' ')))
+        cols['predWordOffsets'].append(len(cols['predWords']))
+
+    def encode(self, words):
+        vocab = self.vocab
+        return [vocab.setdefault(w, len(vocab)) for w in words]
+
+    def finalize(self):
+        ''' Convert the filled columns into numpy arrays '''
+        self.columns['elementOffsets'].append(len(self.columns['tokens']))
+        for name, _, dtype in ExtractionStore.COLUMNS:
+            setattr(self, name, np.frombuffer(self.columns[name], dtype = dtype).copy())
+        del self.columns
+        self.matched = np.zeros(len(self.confidence), dtype = bool)
+        # Token span of each extraction
+        self.tokenStarts = self.elementOffsets[self.extractionElements[:-1]]
+        self.tokenEnds = self.elementOffsets[self.extractionElements[1:]]
+        return self
+
+    def __len__(self):
+        return len(self.confidence)
+
+    def tokenBlock(self, rows):
+        ''' Ragged (ids, lengths) block of the tokens of the given extractions '''
+        return ExtractionStore.gather(self.tokens, self.tokenStarts[rows], self.tokenEnds[rows])
+
+    def predWordBlock(self, rows, words = None):
+        ''' Ragged (ids, lengths) block of the predicate words of the given extractions.
+            words - optional array aligned with predWords (e.g., their lemmas) to gather from instead '''
+        return ExtractionStore.gather(self.predWords if words is None else words,
+                                      self.predWordOffsets[:-1][rows],
+                                      self.predWordOffsets[1:][rows])
+
+    def predTokens(self, row):
+        ''' Token ids of an extraction's predicate '''
+        start = self.elementOffsets[self.extractionElements[row]]
+        return self.tokens[start:self.elementOffsets[self.extractionElements[row] + 1]]
+
+    def bowWords(self, row):
+        ''' Same as the corresponding Extraction's bowWords (mostly useful for debugging) '''
+        words = dict([(i, w) for w, i in self.vocab.items()])
+        return [words[i] for i in self.tokens[self.tokenStarts[row]:self.tokenEnds[row]]]
+
+    @staticmethod
+    def gather(buf, starts, ends):
+        ''' Concatenate the given spans of buf, without a python loop over the spans '''
+        lengths = ends - starts
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return buf[np.arange(lengths.sum()) + offsets], lengths
+
+    # CONSTANTS
+    # (name, array typecode, numpy dtype), word ids are 32 bit while offsets may need 64
+    COLUMNS = [('confidence', 'd', np.float64),
+               ('sentenceIds', 'i', np.intc),
+               ('splitsConjunctions', 'b', np.bool_),
+               ('tokens', 'i', np.intc),
+               ('elementOffsets', 'q', np.int64),
+               ('extractionElements', 'q', np.int64),
+               ('predWords', 'i', np.intc),
+               ('predWordOffsets', 'q', np.int64)]
@@ -1,6 +1,5 @@
 from oie_readers.oieReader import OieReader
 from oie_readers.extraction import Extraction
-from _collections import defaultdict
 
 class GoldReader(OieReader):
     
@@ -10,8 +9,7 @@ class GoldReader(OieReader):
     def __init__(self):
         self.name = 'Gold'
     
-    def read(self, fn):
-        d = defaultdict(lambda: [])
+    def iterExtractions(self, fn):
         with open(fn) as fin:
             for line in fin:
                 data = line.strip().split('\t')
@@ -23,13 +21,12 @@ class GoldReader(OieReader):
                 for arg in args:
                     curExtraction.addArg(arg)
                     
-                d[text].append(curExtraction)
-        self.oie = d
+                yield curExtraction
         
 
 if __name__ == '__main__' :
     g = GoldReader()
-    g.read('../oie_corpus/all.oie', includeNominal = False)
+    g.read('../oie_corpus/all.oie')
     d = g.oie
     e = list(d.items())[0]
     print(e[1][0].bow())
@@ -1,10 +1,66 @@
+from itertools import groupby
+from oie_readers.extractionStore import ExtractionStore
+import profiler
+
 class OieReader:
     
-    def read(self, fn, includeNominal):
+    def read(self, fn):
         ''' should set oie as a class member 
         as a dictionary of extractions by sentence'''
+        d = {}
+        with profiler.stage('read'):
+            for sent, extractions in self.iterSentences(fn):
+                d[sent] = d.get(sent, []) + extractions
+        self.oie = d
+
+    def iterSentences(self, fn):
+        ''' Lazily yields (sentence, extractions) tuples, grouping consecutive
+        extractions of the same sentence, while reading fn.
+        Sentences whose extractions aren't consecutive in fn are yielded more than once.
+        Parsing is timed as the 'read' stage of the active profiler. '''
+        groups = ((sent, list(extractions))
+                  for sent, extractions in groupby(self.iterExtractions(fn), key = lambda ex: ex.sent))
+        for sent, extractions in profiler.timedIter('read', groups):
+            profiler.count('sentencesRead')
+            profiler.count('extractionsRead', len(extractions))
+            yield sent, extractions
+
+    def readStore(self, fn, vocab = None):
+        ''' Read fn into a columnar ExtractionStore, whose words are encoded using
+        (and added to) vocab. Extractions are read one sentence at a time. '''
+        store = ExtractionStore(vocab)
+        with profiler.stage('read'):
+            for _, extractions in self.iterSentences(fn):
+                for extraction in extractions:
+                    store.add(extraction)
+            return store.finalize()
+
+    def iterExtractions(self, fn):
+        ''' should lazily yield the extractions in fn, in order '''
         raise Exception("Don't run me")
+
+    def normalizedExtractions(self, extractions_fn):
+        ''' Normalize confidence to resemble probabilities.
+        Lazily yields the extractions returned by calling extractions_fn, which is called twice:
+        the first pass only finds the range of confidences. '''
+        EPSILON = 1e-3
+
+        minConfidence = maxConfidence = None
+        for extraction in extractions_fn():
+            if minConfidence is None:
+                minConfidence = maxConfidence = extraction.confidence
+            minConfidence = min(minConfidence, extraction.confidence)
+            maxConfidence = max(maxConfidence, extraction.confidence)
+        if minConfidence is None:
+            # No extractions
+            return
+
+        denom = maxConfidence - minConfidence + (2*EPSILON)
+
+        for extraction in extractions_fn():
+            extraction.confidence = ( (extraction.confidence - minConfidence) + EPSILON) / denom
+            yield extraction
     
     def count(self):
         ''' number of extractions '''
-        return sum([len(extractions) for _, extractions in list(self.oie.items())])
\ No newline at end of file
+        return sum([len(extractions) for _, extractions in list(self.oie.items())])
@@ -7,8 +7,7 @@ class OllieReader(OieReader):
         self.name = 'OLLIE'
     
     
-    def read(self, fn):
-        d = {}
+    def iterExtractions(self, fn):
         with open(fn) as fin:
             fin.readline() #remove header
             for line in fin:
@@ -17,7 +16,6 @@ class OllieReader(OieReader):
                 curExtraction = Extraction(pred = rel, sent = text, confidence = float(confidence))
                 curExtraction.addArg(arg1)
                 curExtraction.addArg(arg2)
-                d[text] = d.get(text, []) + [curExtraction]
-        self.oie = d
+                yield curExtraction
     
 
@@ -6,8 +6,7 @@ class OpenieFourReader(OieReader):
     def __init__(self):
         self.name = 'OpenIE-4'
     
-    def read(self, fn):
-        d = {}
+    def iterExtractions(self, fn):
         with open(fn) as fin:
             for line in fin:
                 data = line.strip().split('\t')
@@ -19,5 +18,4 @@ class OpenieFourReader(OieReader):
                 curExtraction = Extraction(pred = rel, sent = text, confidence = float(confidence))
                 curExtraction.addArg(arg1)
                 curExtraction.addArg(arg2)
-                d[text] = d.get(text, []) + [curExtraction]
-        self.oie = d
+                yield curExtraction
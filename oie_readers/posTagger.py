@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+class PosTagger:
+    ''' Memoized POS tagging of word sequences, each tagged on its own (as nltk.pos_tag(words) would).
+    Sequences of the sentence currently being processed can be registered ahead of time,
+    so that they are all tagged in a single batch once any of them is needed. '''
+    def __init__(self):
+        self.cache = {}
+        self.pendingSent = None
+        self.pending = []
+
+    def register(self, sent, words):
+        ''' Schedule words (taken from sent) to be tagged along with the rest of sent's sequences.
+        Only the most recent sentence's sequences are kept. '''
+        if sent != self.pendingSent:
+            self.pendingSent = sent
+            self.pending = []
+        self.pending.append(tuple(words))
+
+    def tag(self, words, sent = None):
+        ''' POS tags of words, tagging sent's pending sequences along with them '''
+        words = tuple(words)
+        if words not in self.cache:
+            batch = [words]
+            if (sent is not None) and (sent == self.pendingSent):
+                batch += self.pending
+                self.pending = []
+            self.tagBatch(batch)
+        return self.cache[words]
+
+    def tagBatch(self, sequences):
+        ''' Tag all given sequences which aren't cached yet with a single tagger call '''
+        sequences = list(set([s for s in sequences if s not in self.cache]))
+        if not sequences:
+            return
+        # NLTK is slow to import, and is only needed once there's something to tag
+        from nltk import pos_tag_sents
+        if len(self.cache) + len(sequences) > PosTagger.CACHE_SIZE:
+            self.cache.clear()
+        for words, tagged in zip(sequences, pos_tag_sents([list(s) for s in sequences])):
+            self.cache[words] = [tag for _, tag in tagged]
+
+    def isPronoun(self, word, sent = None):
+        ''' Is this single word tagged as a (personal or possessive) pronoun.
+        Only words which were already tagged skip the tagger, through its cache. '''
+        return 'PRP' in self.tag([word], sent)[0]
+
+    # CONSTANTS
+    CACHE_SIZE = 1 << 18
+
+
+@lru_cache(maxsize = PosTagger.CACHE_SIZE)
+def tokenize(s):
+    ''' Memoized nltk.word_tokenize, returns a tuple '''
+    from nltk import word_tokenize
+    return tuple(word_tokenize(s))
+
+
+# Shared by all arguments and extractions
+posTagger = PosTagger()
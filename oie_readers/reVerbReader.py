@@ -3,12 +3,11 @@ from oie_readers.extraction import Extraction
 
 class ReVerbReader(OieReader):
     
-    def __init__(self):
-        self.inputSents = [sent.strip() for sent in open(ReVerbReader.RAW_SENTS_FILE).readlines()]
+    def __init__(self, raw_sents_file = None):
+        self.inputSents = [sent.strip() for sent in open(raw_sents_file or ReVerbReader.RAW_SENTS_FILE).readlines()]
         self.name = 'ReVerb'
     
-    def read(self, fn):
-        d = {}
+    def iterExtractions(self, fn):
         with open(fn) as fin:
             for line in fin:
                 data = line.strip().split('\t')
@@ -19,8 +18,7 @@ class ReVerbReader(OieReader):
                 curExtraction = Extraction(pred = rel, sent = text, confidence = float(confidence))
                 curExtraction.addArg(arg1)
                 curExtraction.addArg(arg2)
-                d[text] = d.get(text, []) + [curExtraction]
-        self.oie = d
+                yield curExtraction
         
     # ReVerb requires a different files from which to get the input sentences
     # Relative to repo root folder
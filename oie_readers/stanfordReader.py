@@ -6,8 +6,7 @@ class StanfordReader(OieReader):
     def __init__(self):
         self.name = 'Stanford'
     
-    def read(self, fn):
-        d = {}
+    def iterExtractions(self, fn):
         with open(fn) as fin:
             for line in fin:
                 data = line.strip().split('\t')
@@ -18,5 +17,4 @@ class StanfordReader(OieReader):
                 curExtraction = Extraction(pred = rel, sent = text, confidence = float(confidence))
                 curExtraction.addArg(arg1)
                 curExtraction.addArg(arg2)
-                d[text] = d.get(text, []) + [curExtraction]
-        self.oie = d
+                yield curExtraction
@@ -0,0 +1,41 @@
+"""
+Pickled files which are kept next to the benchmark's inputs, and rebuilt when missing or stale:
+the gold index (see gold_index.py) and the match caches (see match_cache.py).
+Several evaluations may share these files, so they're replaced atomically, and a file which
+can't be read or written is logged and otherwise ignored.
+"""
+import os
+import pickle
+import logging
+import tempfile
+
+def readPickle(fn, description):
+    ''' The object pickled in fn, or None if it doesn't exist or can't be read.
+        description - what the file holds, for the log (e.g., "gold index") '''
+    if not os.path.exists(fn):
+        return None
+    try:
+        with open(fn, 'rb') as fin:
+            return pickle.load(fin)
+    except Exception as e:
+        logging.warning("Ignoring unreadable {} {}: {}".format(description, fn, e))
+        return None
+
+def writePickle(obj, fn, description):
+    ''' Pickle obj into a temporary file next to fn, and then replace fn with it, so that
+        readers never see a partially written file '''
+    tmp_fn = None
+    try:
+        fd, tmp_fn = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(fn)))
+        with os.fdopen(fd, 'wb') as fout:
+            pickle.dump(obj, fout, protocol = pickle.HIGHEST_PROTOCOL)
+        # mkstemp creates files which only their owner can read
+        os.chmod(tmp_fn, 0o644)
+        os.replace(tmp_fn, fn)
+        tmp_fn = None
+    except (IOError, OSError) as e:
+        logging.warning("Couldn't write {} {}: {}".format(description, fn, e))
+    finally:
+        # Also when pickling fails
+        if tmp_fn is not None:
+            os.remove(tmp_fn)
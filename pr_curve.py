@@ -0,0 +1,78 @@
+"""
+Precision-recall curves and summary metrics, computed with numpy alone.
+The curve is the same as scikit-learn's (0.18) precision_recall_curve, which it replaces,
+and it's computed with a single sort followed by cumulative sums.
+"""
+import numpy as np
+
+class PRCurve:
+    ''' Precision and recall of a scored set of predictions, at all of its confidence thresholds '''
+    def __init__(self, y_true, y_scores, recallMultiplier = 1.0):
+        '''
+        y_true - whether each prediction is correct
+        y_scores - the confidence of each prediction
+        recallMultiplier - scales recall, to account for the gold extractions which
+                           none of the predictions reached
+        '''
+        y_true = np.asarray(y_true, dtype = bool)
+        y_scores = np.asarray(y_scores, dtype = float)
+
+        # Descending scores, ordered as in scikit-learn
+        order = np.argsort(y_scores, kind = 'mergesort')[::-1]
+        self.scores = y_scores[order]
+        # Number of correct predictions among the top i + 1
+        self.cumTrue = np.cumsum(y_true[order], dtype = float)
+        self.recallMultiplier = recallMultiplier
+
+        # Each threshold is the last prediction of a run of (nearly) equal scores
+        distinct = np.where(np.logical_not(np.isclose(np.diff(self.scores), 0)))[0]
+        self.thresholdIndices = np.r_[distinct, len(self.scores) - 1]
+        self.thresholds = self.scores[self.thresholdIndices]
+        self.tps = self.cumTrue[self.thresholdIndices]
+        self.precision = self.tps / (self.thresholdIndices + 1)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            self.recall = self.tps / self.tps[-1] * recallMultiplier
+
+    def curve(self):
+        ''' (precision, recall, thresholds), as returned by precision_recall_curve (with scaled recall):
+            by decreasing recall, stopping at the first threshold at which full recall is attained,
+            and ending with a precision of 1 at a recall of 0 '''
+        sl = slice(self.tps.searchsorted(self.tps[-1]), None, -1)
+        return (np.r_[self.precision[sl], 1],
+                np.r_[self.recall[sl], 0],
+                self.thresholds[sl])
+
+    def sortedCurve(self):
+        ''' (precision, recall) of the curve, ordered by increasing recall (stable for equal recalls) '''
+        p, r, _ = self.curve()
+        order = np.argsort(r, kind = 'mergesort')
+        return p[order], r[order]
+
+    def auc(self):
+        ''' Area under the curve, by the trapezoidal rule '''
+        p, r = self.sortedCurve()
+        return float(np.sum(np.diff(r) * (p[1:] + p[:-1]) / 2))
+
+    def maxF1(self):
+        ''' (f1, precision, recall, threshold) of the threshold with the best F1 '''
+        p, r, thresholds = self.curve()
+        p, r = p[:-1], r[:-1]
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            f1 = np.nan_to_num(2 * p * r / (p + r))
+        best = np.argmax(f1)
+        return float(f1[best]), float(p[best]), float(r[best]), float(thresholds[best])
+
+    def precisionAt(self, k):
+        ''' Precision of the k most confident predictions '''
+        k = min(k, len(self.cumTrue))
+        return float(self.cumTrue[k - 1] / k) if k else 1.0
+
+    def at(self, threshold):
+        ''' (precision, recall) of the predictions whose confidence is at least threshold '''
+        # Scores are descending, so count the predictions scoring below threshold from the end
+        count = len(self.scores) - np.searchsorted(self.scores[::-1], threshold, side = 'left')
+        if not count:
+            return 1.0, 0.0
+        tps = self.cumTrue[count - 1]
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return float(tps / count), float(tps / self.cumTrue[-1] * self.recallMultiplier)
@@ -0,0 +1,139 @@
+"""
+Profiling of benchmark runs: wall time and peak memory of each stage, and counts of events
+(e.g., matcher calls). Stages and counts are recorded into the active Profiler, if there's one,
+and are no-ops otherwise, so that instrumented code costs (almost) nothing when not profiling.
+"""
+import os
+import json
+import time
+import resource
+import tracemalloc
+from contextlib import contextmanager
+from collections import defaultdict
+
+class Profiler:
+    ''' Stages and counters of a single run, active between start and stop (or within a with block).
+        Stage times are exclusive of nested stages, so that the times of all stages add up.
+        Memory is the peak of traced allocations during a stage (including nested stages),
+        above those at its start. Tracing memory slows the run down, so times are only
+        comparable across profiled runs. Python versions before 3.9 can't reset the traced peak,
+        so there a stage's memory is bounded by the peak of the whole run so far. '''
+    def __init__(self):
+        # Stage name -> {'time', 'calls', 'peakMemory'}
+        self.stages = {}
+        self.counters = defaultdict(int)
+        # [start memory, peak memory, time of nested stages] of each open stage
+        self.open = []
+        self.startedTracing = False
+
+    def start(self):
+        global _active
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.startedTracing = True
+        self.wallStart = time.time()
+        _active = self
+        return self
+
+    def stop(self):
+        global _active
+        self.wallTime = time.time() - self.wallStart
+        _active = None
+        if self.startedTracing:
+            tracemalloc.stop()
+            self.startedTracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @contextmanager
+    def stage(self, name):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.open:
+            # Our peak is reset below, keep the enclosing stage's
+            self.open[-1][1] = max(self.open[-1][1], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        entry = [current, current, 0.0]
+        self.open.append(entry)
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            self.open.pop()
+            peak = max(entry[1], tracemalloc.get_traced_memory()[1])
+            if self.open:
+                self.open[-1][1] = max(self.open[-1][1], peak)
+                self.open[-1][2] += elapsed
+            stats = self.stages.setdefault(name, {'time': 0.0, 'calls': 0, 'peakMemory': 0})
+            stats['time'] += elapsed - entry[2]
+            stats['calls'] += 1
+            stats['peakMemory'] = max(stats['peakMemory'], peak - entry[0])
+
+    def timedIter(self, name, iterable):
+        ''' Yields the items of iterable, timing the production of each one as the given stage '''
+        it = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, n = 1):
+        self.counters[name] += int(n)
+
+    def summary(self):
+        ''' The profile as a JSON serializable dictionary '''
+        return {'wallTime': self.wallTime,
+                # Of the whole process, in kilobytes
+                'maxRSS': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                'stages': self.stages,
+                'counters': dict(self.counters)}
+
+    def write(self, output_fn, **extra):
+        ''' Write the summary, along with any extra fields, as JSON to output_fn '''
+        ret = self.summary()
+        ret.update(extra)
+        with open(output_fn, 'w') as fout:
+            json.dump(ret, fout, indent = 2, sort_keys = True)
+
+# The Profiler recording stages and counts, set by Profiler.start
+_active = None
+
+def stage(name):
+    ''' Context manager timing a stage of the active profiler, if any '''
+    if _active is None:
+        return NO_STAGE
+    return _active.stage(name)
+
+def timedIter(name, iterable):
+    ''' iterable, with the production of its items timed by the active profiler, if any '''
+    if _active is None:
+        return iterable
+    return _active.timedIter(name, iterable)
+
+def count(name, n = 1):
+    ''' Add n to a counter of the active profiler, if any '''
+    if _active is not None:
+        _active.count(name, n)
+
+def profileFilename(output_fn):
+    ''' Profile of a system, written next to its PR curve '''
+    return '{}.profile.json'.format(os.path.splitext(output_fn)[0])
+
+class NullStage:
+    ''' Context manager which does nothing, used when not profiling
+        (contextlib.nullcontext needs Python 3.7) '''
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+NO_STAGE = NullStage()
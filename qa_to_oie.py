@@ -1,16 +1,22 @@
 """ Usage:
-    qa_to_oie --in=INPUT_FILE --out=OUTPUT_FILE [--dist=DIST_FILE] [--oieinput=OIE_INPUT] 
+    qa_to_oie --in=INPUT_FILE --out=OUTPUT_FILE [--dist=DIST_FILE] [--oieinput=OIE_INPUT] [--max-combinations=MAX_COMBINATIONS]
+
+Options:
+  --max-combinations=MAX_COMBINATIONS  Maximal number of extractions generated per predicate,
+                                       out of all combinations of its answers (unbounded by default).
 """
 
 from docopt import docopt
 import re
 import itertools
-from oie_readers.extraction import Extraction, escape_special_chars, normalize_element
+from oie_readers.extraction import Extraction, escape_special_chars, normalize_element, filter_pronoun_args
 from collections  import defaultdict
+from span_locator import SpanLocator
 import logging
 import operator
-import nltk
+from functools import reduce
 import json
+import hashlib
 
 from oie_readers.extraction import QUESTION_TRG_INDEX
 from oie_readers.extraction import QUESTION_PP_INDEX
@@ -67,73 +73,146 @@ QA_SRL_AUX_MODIFIERS = [
 
 
 class Qa2OIE:
-    # Static variables
-    extractions_counter = 0
-
-    def __init__(self, qaFile, dist_file = ""):
+    def __init__(self, qaFile, dist_file = "", question_dist = None, max_combinations = None):
         """
         Loads qa file and converts it into  open IE
         If a distribtion file is given, it is used to determine the hopefully correct
         order of arguments. Otherwise, these are oredered accroding to their linearization
+        An already loaded distribution (see load_question_dist) can be given instead,
+        to share it across several conversions.
+        max_combinations caps the number of extractions generated per predicate (see expandAnswers).
         """
-        # This next lines ensures that the json is loaded with numerical
-        # indexes for loc
-        self.question_dist = dict([(q, dict([(int(loc), cnt)
-                                             for (loc, cnt)
-                                             in dist.items()]))
-                                   for (q, dist)
-                                   in json.load(open(dist_file)).items()]) \
-                                       if dist_file\
-                                          else {}
-
-        self.dic = self.loadFile(self.getExtractions(qaFile))
-
-    def loadFile(self, lines):
-        sent = ''
-        d = {}
+        self.question_dist = question_dist if question_dist is not None \
+                             else load_question_dist(dist_file)
+        self.max_combinations = max_combinations
+        # Answer combinations which weren't converted, either repeating a previous
+        # extraction of their sentence or beyond max_combinations
+        self.duplicateCombinations = 0
+        self.cappedCombinations = 0
+
+        self.qaFile = qaFile
+        self.cachedDic = None
+
+    @property
+    def dic(self):
+        """
+        Sentence to extractions dictionary of the whole file.
+        This keeps all extractions in memory, iterSentences should be preferred for large files.
+        """
+        if self.cachedDic is None:
+            self.cachedDic = dict(self.iterSentences())
+        return self.cachedDic
 
-        indsForQuestions = defaultdict(lambda: set())
+    def iterSentences(self):
+        """
+        Yields (sentence, extractions) pairs, converting one sentence at a time.
+        """
+        return self.loadFile(self.getExtractions(self.qaFile))
 
-        for line in lines.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            data = line.split('\t')
-            if len(data) == 1:
-                if sent:
-                    for ex in d[sent]:
-                        ex.indsForQuestions = dict(indsForQuestions)
-                sent = line
-                d[sent] = []
-                indsForQuestions = defaultdict(lambda: set())
+    def loadFile(self, sentences):
+        """
+        Given (sentence, lines) pairs, as generated by getExtractions, yields
+        (sentence, extractions) pairs of the extractions which pass the pronoun filter.
+        """
+        # Each sentence is yielded once the next one is read, since the questions'
+        # indices are assigned to all but the last sentence
+        prev = None
 
-            else:
+        for sent, lines in sentences:
+            if prev is not None:
+                prevSent, extractions, indsForQuestions = prev
+                for ex in extractions:
+                    ex.indsForQuestions = dict(indsForQuestions)
+                yield prevSent, extractions
+
+            indsForQuestions = defaultdict(lambda: set())
+            candidates = []
+            rows = [line.strip().split('\t') for line in lines]
+            # Locates all predicates and answers in the sentence at once, same as all_index
+            locator = SpanLocator(sent,
+                                  [data[0] for data in rows] + [a for data in rows for a in data[3::2]],
+                                  matchCase = False)
+            for data in rows:
                 pred = data[0]
                 pred_index = data[1]
-                cur = Extraction((pred, all_index(sent, pred, matchCase = False)),
+                cur = Extraction((pred, locator.find(pred)),
                                  sent,
                                  confidence = 1.0,
                                  question_dist = self.question_dist)
                 for q, a in zip(data[2::2], data[3::2]):
-                    indices = all_index(sent, a, matchCase = False)
+                    indices = locator.find(a)
                     cur.addArg((a, indices), q)
                     indsForQuestions[q] = indsForQuestions[q].union(indices)
+                candidates.append(cur)
 
-                if sent:
-                    if cur.noPronounArgs():
-                        d[sent].append(cur)
-        return d
+            prev = (sent, filter_pronoun_args(candidates), indsForQuestions)
+
+        if prev is not None:
+            yield prev[0], prev[1]
 
     def getExtractions(self, qa_srl_path, mask = get_default_mask()):
         """
         Parse a QA-SRL file (with raw sentences) at qa_srl_path.
-        Returns output which can in turn serve as input for load_file.
+        Yields (sentence, lines) pairs, where lines lazily generates the sentence's
+        tab separated extractions, which can in turn serve as input for load_file.
+        """
+        for sent, predicates in self.readSentences(qa_srl_path):
+            sentQAs = []
+            for predIndex, basePred, questionLines in predicates:
+                surfacePred = basePred
+                curAnswers = []
+                for info in questionLines:
+                    question = encodeQuestion("\t".join(info[:-1]), mask)
+                    curSurfacePred = augment_pred_with_question(basePred, question)
+                    if len(curSurfacePred) > len(surfacePred):
+                        surfacePred = curSurfacePred
+                    answers = self.consolidate_answers(info[-1].split("###"))
+                    curAnswers.append(list(zip([question]*len(answers), answers)))
+                sentQAs.append(((surfacePred, predIndex),
+                                curAnswers))
+            yield sent, self.printSent(sent, sentQAs)
+
+    def readSentences(self, qa_srl_path):
+        """
+        Yields (sentence, predicates) pairs from a QA-SRL file, where predicates is a list
+        of (predicate index, predicate, question lines) tuples, and each question line is split by tabs.
+        A sentence which is annotated more than once is yielded at its first position, with its last
+        annotation, which replaces the previous ones.
+        Annotations are counted by a digest of their sentence, rather than by the sentence itself,
+        so that the counts take a fixed amount of memory per sentence. Only the last annotations of
+        repeated sentences are kept in memory, until they're yielded.
+        """
+        counts = defaultdict(int)
+        lastAnnotations = {}
+        for sent, predicates in self.parseQASRL(qa_srl_path):
+            digest = Qa2OIE.sentenceDigest(sent)
+            counts[digest] += 1
+            if counts[digest] > 1:
+                lastAnnotations[digest] = predicates
+
+        for sent, predicates in self.parseQASRL(qa_srl_path):
+            digest = Qa2OIE.sentenceDigest(sent)
+            if counts[digest] > 1:
+                if digest not in lastAnnotations:
+                    # Already yielded
+                    continue
+                logging.warning("Sentence appears {} times, keeping its last annotation: {}".format(counts[digest], sent))
+                predicates = lastAnnotations.pop(digest)
+            yield sent, predicates
+
+    @staticmethod
+    def sentenceDigest(sent):
+        ''' Fixed size key of a sentence '''
+        return hashlib.sha1(sent.encode('utf-8')).digest()
+
+    def parseQASRL(self, qa_srl_path):
+        """
+        Generates the raw records of a QA-SRL file, see readSentences.
         """
         lc = 0
-        sentQAs = []
-        curAnswers = []
+        predicates = []
+        questionLines = []
         curSent = ""
-        ret = ''
 
         for line in open(qa_srl_path, 'r'):
             if line.startswith('#'):
@@ -143,66 +222,67 @@ class Qa2OIE:
             if lc == 0:
                 # Read sentence ID.
                 sent_id = int(info[0].split("_")[1])
-                ptb_id = []
                 lc += 1
             elif lc == 1:
                 if curSent:
-                    ret += self.printSent(curSent, sentQAs)
+                    yield curSent, predicates
                 # Write sentence.
                 curSent = line
                 lc += 1
-                sentQAs = []
+                predicates = []
             elif lc == 2:
-                if curAnswers:
-                    sentQAs.append(((surfacePred, predIndex),
-                                    curAnswers))
-                curAnswers = []
+                questionLines = []
                 # Update line counter.
                 if line.strip() == "":
                     lc = 0 # new line for new sent
                 else:
                     # reading predicate and qa pairs
                     predIndex, basePred, count = info
-                    surfacePred = basePred
                     lc += int(count)
             elif lc > 2:
-                question = encodeQuestion("\t".join(info[:-1]), mask)
-                curSurfacePred = augment_pred_with_question(basePred, question)
-                if len(curSurfacePred) > len(surfacePred):
-                    surfacePred = curSurfacePred
-                answers = self.consolidate_answers(info[-1].split("###"))
-                curAnswers.append(list(zip([question]*len(answers), answers)))
-
+                questionLines.append(info)
                 lc -= 1
                 if (lc == 2):
                     # Reached the end of this predicate's questions
-                    sentQAs.append(((surfacePred, predIndex),
-                                    curAnswers))
-                    curAnswers = []
+                    predicates.append((predIndex, basePred, questionLines))
+                    questionLines = []
         # Flush
-        if sentQAs:
-            ret += self.printSent(curSent, sentQAs)
-
-        return ret
+        if predicates:
+            yield curSent, predicates
 
     def printSent(self, sent, sentQAs):
-        ret =  sent + "\n"
+        # The lines generated for the sentence so far, see expandAnswers
+        seen = set()
         for (pred, pred_index), predQAs in sentQAs:
-            for element in itertools.product(*predQAs):
-                self.encodeExtraction(element)
-                ret += "\t".join([pred, pred_index] + ["\t".join(x) for x in element]) + "\n"
-        ret += "\n"
-        return ret
+            for line in self.expandAnswers(pred, pred_index, predQAs, seen):
+                yield line
 
-    def encodeExtraction(self, element):
-        questions = list(map(operator.itemgetter(0),element))
-        extractionSet = set(questions)
-        encoding = repr(extractionSet)
-        (count, _, extractions) = extractionsDic.get(encoding, (0, extractionSet, []))
-        extractions.append(Qa2OIE.extractions_counter)
-        Qa2OIE.extractions_counter += 1
-        extractionsDic[encoding] = (count+1, extractionSet, extractions)
+    def expandAnswers(self, pred, pred_index, predQAs, seen):
+        """
+        Lazily generates the extraction lines of the combinations of a single answer to each of a predicate's
+        questions, in itertools.product order.
+        Lines which are in seen (the lines already generated for the sentence) are skipped, as they'd repeat
+        an extraction, e.g., when a predicate is annotated more than once in the sentence. Generated lines are
+        added to seen.
+        If max_combinations is set, at most that many lines are generated, and skipped lines don't count towards it.
+        """
+        generated = 0
+        examined = 0
+        for element in itertools.product(*predQAs):
+            if (self.max_combinations is not None) and (generated >= self.max_combinations):
+                break
+            examined += 1
+            line = "\t".join([pred, pred_index] + ["\t".join(x) for x in element])
+            if line in seen:
+                self.duplicateCombinations += 1
+                continue
+            seen.add(line)
+            generated += 1
+            yield line
 
+        # The rest of the combinations are counted, rather than enumerated
+        capped = reduce(operator.mul, map(len, predQAs), 1) - examined
+        self.cappedCombinations += capped
 
     def consolidate_answers(self, answers):
         """
@@ -210,30 +290,53 @@ class Qa2OIE:
         contain any other answer in the set.
         This deals with certain QA-SRL anntoations which include a longer span than that is needed.
         """
+        # Tokenized once, split as in is_str_subset
+        contained = [answer.split() for answer in answers]
+        containers = [answer.split(" ") for answer in answers]
         ret = []
         for i, first_answer in enumerate(answers):
-            includeFlag = True
-            for j, second_answer in enumerate(answers):
-                if (i != j) and (is_str_subset(second_answer, first_answer)) :
-                    includeFlag = False
-                    continue
-            if includeFlag:
+            container = containers[i]
+            containerWords = set(container)
+            # Length and word set inclusion are cheap necessary conditions for containment
+            if not any((i != j) and
+                       (len(words) <= len(container)) and
+                       containerWords.issuperset(words) and
+                       is_subsequence(words, container)
+                       for j, words in enumerate(contained)):
                 ret.append(first_answer)
         return ret
 
     def createOIEInput(self, fn):
         with open(fn, 'a') as fout:
-            for sent in self.dic:
+            for sent, _ in self.readSentences(self.qaFile):
                 fout.write(sent + '\n')
 
     def writeOIE(self, fn):
+        ''' Converts and writes one sentence at a time '''
         with open(fn, 'w') as fout:
-            for sent, extractions in self.dic.items():
+            for sent, extractions in self.iterSentences():
                 for ex in extractions:
                     fout.write('{}\t{}\n'.format(escape_special_chars(sent), 
                                                  ex.__str__()))
+        if self.duplicateCombinations or self.cappedCombinations:
+            logging.info("Skipped {} duplicate and {} capped answer combinations".format(self.duplicateCombinations,
+                                                                                       self.cappedCombinations))
 
 # MORE HELPER
+def load_question_dist(dist_file):
+    """
+    Load a question distribution file, or return an empty distribution if none is given.
+    """
+    # This next lines ensures that the json is loaded with numerical
+    # indexes for loc
+    return dict([(q, dict([(int(loc), cnt)
+                           for (loc, cnt)
+                           in dist.items()]))
+                 for (q, dist)
+                 in json.load(open(dist_file)).items()]) \
+                     if dist_file\
+                        else {}
+
 def augment_pred_with_question(pred, question):
     """
     Decide what elements from the question to incorporate in the given
@@ -253,23 +356,16 @@ def augment_pred_with_question(pred, question):
 
 def is_str_subset(s1, s2):
     """ returns true iff the words in string s1 are contained in string s2 in the same order by which they appear in s2 """
-    all_indices = [find_all_indices(s2.split(" "), x) for x in s1.split()]
-    if not all(all_indices):
-        return False
-    for combination in itertools.product(*all_indices):
-        if strictly_increasing(combination):
-            return True
-    return False
-
-def find_all_indices(ls, elem):
-    return  [i for i,x in enumerate(ls) if x == elem]
+    return is_subsequence(s1.split(), s2.split(" "))
 
-def strictly_increasing(L):
-    return all(x<y for x, y in zip(L, L[1:]))
+def is_subsequence(ls1, ls2):
+    """ returns true iff ls1 is a (not necessarily contiguous) subsequence of ls2.
+    Greedily matching each element to its first occurrence is enough, and takes linear time. """
+    it = iter(ls2)
+    return all(any(x == y for y in it) for x in ls1)
 
 
 questionsDic = {}
-extractionsDic = {}
 
 def encodeQuestion(question, mask):
     info = [mask[i](x).replace(" ","_") for i,x in enumerate(question.split("\t"))]
@@ -322,7 +418,8 @@ if __name__ == '__main__':
     out = args['--out']
     dist_file = args['--dist'] if args['--dist']\
            else ''
-    q = Qa2OIE(args['--in'], dist_file = dist_file)
+    q = Qa2OIE(args['--in'], dist_file = dist_file,
+               max_combinations = int(args['--max-combinations']) if args['--max-combinations'] else None)
     q.writeOIE(args['--out'])
     if args['--oieinput']:
         q.createOIEInput(args['--oieinput'])
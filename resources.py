@@ -0,0 +1,65 @@
+""" Usage:
+    resources [--download]
+
+    Check, without accessing the network, that the NLTK resources used by the benchmark and by
+    the QA-SRL conversion are installed. None of them are downloaded implicitly, so on a new
+    machine this should be run (with --download) once, ahead of time.
+
+Options:
+  --download  Download the missing resources.
+"""
+import sys
+import logging
+
+# (resource, NLTK package names, used for), where any of the packages provides
+# the resource (their names changed across NLTK versions)
+RESOURCES = [('corpora/wordnet', ['wordnet'],
+              'lemmatizing predicate words missing from the lemma table (benchmark.py)'),
+             ('corpora/stopwords', ['stopwords'],
+              'ignoring stopwords in Matcher.bowMatch'),
+             ('tokenizers/punkt', ['punkt', 'punkt_tab'],
+              'tokenizing arguments (qa_to_oie.py)'),
+             ('taggers/averaged_perceptron_tagger', ['averaged_perceptron_tagger', 'averaged_perceptron_tagger_eng'],
+              'filtering pronoun arguments (qa_to_oie.py)')]
+
+def isInstalled(resource, packages):
+    ''' Is any of the resource's packages found on the NLTK data path '''
+    import nltk
+    for path in set([resource] + [resource.rsplit('/', 1)[0] + '/' + package for package in packages]):
+        try:
+            nltk.data.find(path)
+            return True
+        except LookupError:
+            pass
+    return False
+
+def missingResources():
+    ''' Resources (as listed in RESOURCES) which aren't installed '''
+    return [(resource, packages, usage)
+            for resource, packages, usage in RESOURCES
+            if not isInstalled(resource, packages)]
+
+
+## MAIN
+if __name__ == '__main__':
+    from docopt import docopt
+    logging.basicConfig(level = logging.INFO)
+    args = docopt(__doc__)
+    logging.debug(args)
+
+    missing = missingResources()
+    for resource, packages, usage in missing:
+        logging.warning("Missing {} (NLTK package {}), needed for {}".format(resource, ' or '.join(packages), usage))
+
+    if missing and args['--download']:
+        import nltk
+        for resource, packages, _ in missing:
+            # Try the packages until one of them is available for this NLTK version
+            for package in packages:
+                if nltk.download(package, quiet = True):
+                    break
+        missing = missingResources()
+
+    if missing:
+        sys.exit(1)
+    logging.info("All resources are installed")
@@ -0,0 +1,347 @@
+""" Usage:
+    scaling_benchmark --gold=GOLD_OIE --out=OUTPUT_FILE [--manifest=MANIFEST] [--qasrl=QASRL_FILE] [--dist=DIST_FILE] [--scales=SCALES] [--repeat=REPEAT] [--baseline=BASELINE_FILE] [--workdir=WORK_DIR] [STAGE]...
+
+    Measure how the stages of an evaluation scale with the size of their input. Each input is
+    replicated SCALE times, where every replica renames its sentences (so that replicas don't
+    merge into the original sentences), and each STAGE is timed on every scale:
+      read     - parsing each system output with its oie_readers reader
+      match    - Matcher.lexicalMatch, bowMatch, bleuMatch and fastBleuMatch over all (gold, predicted) pairs
+                 of the same sentence, for the first system
+      compare  - Benchmark.compare of each system (already read) against the gold
+      qa2oie   - converting QASRL_FILE to Open IE with Qa2OIE (only if --qasrl is given)
+    By default, all stages are run.
+    Timings are written as JSON, along with the per-item time and the scaling exponent of each
+    benchmark (the slope of log(time) over log(size)), so that runs from different commits can
+    be diffed, or compared directly with --baseline.
+
+Options:
+  --gold=GOLD_OIE              The gold reference Open IE file.
+  --out=OUTPUT_FILE            Where to write the timings, as JSON.
+  --manifest=MANIFEST          Tab separated file listing the systems, as accepted by benchmark.py [default: ./systems_output/systems.tsv].
+  --qasrl=QASRL_FILE           A QA-SRL file, on which to time the conversion to Open IE.
+  --dist=DIST_FILE             Question distribution file used by the conversion.
+  --scales=SCALES              Comma separated numbers of replicas of each input [default: 1,10,100].
+  --repeat=REPEAT              Maximal number of times each benchmark is run, smaller inputs are run
+                               until their total time exceeds MIN_TOTAL_TIME [default: 3].
+  --baseline=BASELINE_FILE     The output of a previous run, log how much slower (or faster) each benchmark got.
+  --workdir=WORK_DIR           Where to write the replicated inputs (defaults to a temporary directory, removed at exit).
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import warnings
+import tempfile
+import subprocess
+import numpy as np
+from docopt import docopt
+
+from benchmark import Benchmark, READERS, readManifest
+from matcher import Matcher
+from oie_readers.goldReader import GoldReader
+from oie_readers.reVerbReader import ReVerbReader
+from synthetic_corpus import replicaSentence
+
+class ScalingBenchmark:
+    ''' Times each stage on replicas of the given inputs '''
+    def __init__(self, gold_fn, systems, workdir, repeat):
+        '''
+        gold_fn - the gold Open IE file
+        systems - (format, input filename, name) of each system, as returned by readManifest
+        workdir - where replicas are written, each replica is removed once timed
+        repeat - maximal number of runs of each benchmark
+        '''
+        self.gold_fn = gold_fn
+        self.systems = ScalingBenchmark.existingSystems(systems)
+        self.workdir = workdir
+        self.repeat = repeat
+        # Benchmark name -> scale -> timing
+        self.results = {}
+
+    @staticmethod
+    def existingSystems(systems):
+        ''' The systems whose output file exists, the others are logged and left out of the timings '''
+        ret = []
+        for fmt, input_fn, name in systems:
+            if os.path.exists(input_fn):
+                ret.append((fmt, input_fn, name))
+            else:
+                logging.warning("Skipping {} system, {} doesn't exist".format(fmt, input_fn))
+        return ret
+
+    def run(self, stages, scales, qasrl_fn = None, dist_file = ""):
+        for scale in scales:
+            logging.info("Scale {}".format(scale))
+            gold_fn = self.replicate('gold', self.gold_fn, scale)
+            if 'read' in stages:
+                for fmt, input_fn, _ in self.systems:
+                    self.benchRead(fmt, input_fn, scale)
+            if ('match' in stages) and self.systems:
+                fmt, input_fn, _ = self.systems[0]
+                for matchingFunc in ScalingBenchmark.MATCHERS:
+                    self.benchMatch(matchingFunc, gold_fn, fmt, input_fn, scale)
+            if 'compare' in stages:
+                for fmt, input_fn, _ in self.systems:
+                    for assignment in sorted(Matcher.ASSIGNMENTS):
+                        self.benchCompare(gold_fn, fmt, input_fn, scale, assignment)
+            if ('qa2oie' in stages) and qasrl_fn:
+                self.benchQa2OIE(qasrl_fn, dist_file, scale)
+            os.remove(gold_fn)
+        return self.summary()
+
+    def benchRead(self, fmt, input_fn, scale):
+        replica_fn = self.replicate(fmt, input_fn, scale)
+        def read(reader):
+            reader.read(replica_fn)
+            return reader.count()
+        self.time('read/{}'.format(fmt), scale,
+                  setup = lambda: self.reader(fmt, replica_fn),
+                  run = read)
+        self.removeReplica(fmt, replica_fn)
+
+    def benchMatch(self, matchingFunc, gold_fn, fmt, input_fn, scale):
+        ''' Times matchingFunc over the (gold, predicted) pairs of each sentence,
+            extractions are read anew for each run, so that none of their features are cached '''
+        replica_fn = self.replicate(fmt, input_fn, scale)
+        def pairs():
+            gold = Benchmark.normalizeDict(ScalingBenchmark.readOie(GoldReader(), gold_fn))
+            predicted = Benchmark.normalizeDict(ScalingBenchmark.readOie(self.reader(fmt, replica_fn), replica_fn))
+            return [(goldEx, predictedEx)
+                    for sent, goldExtractions in gold.items()
+                    for goldEx in goldExtractions
+                    for predictedEx in predicted.get(sent, [])]
+        def match(pairs):
+            for goldEx, predictedEx in pairs:
+                matchingFunc(goldEx, predictedEx, ignoreStopwords = True, ignoreCase = True)
+            return len(pairs)
+        self.time('match/{}'.format(matchingFunc.__name__), scale,
+                  setup = pairs,
+                  run = match)
+        self.removeReplica(fmt, replica_fn)
+
+    def benchCompare(self, gold_fn, fmt, input_fn, scale, assignment = 'greedy'):
+        replica_fn = self.replicate(fmt, input_fn, scale)
+        output_fn = os.path.join(self.workdir, 'compare.dat')
+        def load():
+            benchmark = Benchmark(gold_fn, useIndex = False, assignment = assignment)
+            return benchmark, ScalingBenchmark.readOie(self.reader(fmt, replica_fn), replica_fn)
+        def compare(args):
+            benchmark, predicted = args
+            benchmark.compare(predicted = predicted,
+                              matchingFunc = Matcher.lexicalMatch,
+                              output_fn = output_fn)
+            return sum(map(len, predicted.values()))
+        # Greedy assignment keeps its original name, for comparison with older baselines
+        name = 'compare/{}'.format(fmt) if assignment == 'greedy' else 'compare/{}/{}'.format(fmt, assignment)
+        self.time(name, scale,
+                  setup = load,
+                  run = compare)
+        self.removeReplica(fmt, replica_fn)
+        os.remove(output_fn)
+
+    def benchQa2OIE(self, qasrl_fn, dist_file, scale):
+        from qa_to_oie import Qa2OIE, load_question_dist
+        question_dist = load_question_dist(dist_file)
+        replica_fn = self.replicate('qasrl', qasrl_fn, scale)
+        def convert(qa):
+            return sum([1 for _ in qa.iterSentences()])
+        self.time('qa2oie', scale,
+                  setup = lambda: Qa2OIE(replica_fn, question_dist = question_dist),
+                  run = convert)
+        os.remove(replica_fn)
+
+    def time(self, name, scale, setup, run):
+        ''' Record the wall time of run(setup()), which returns the number of items it processed.
+            Only run is timed, and setup is called anew for each run. '''
+        times = []
+        while (len(times) < self.repeat) and \
+              ((not times) or (sum(times) < ScalingBenchmark.MIN_TOTAL_TIME)):
+            args = setup()
+            start = time.time()
+            size = run(args)
+            times.append(time.time() - start)
+        seconds = float(np.median(times))
+        logging.info("{} x{}: {} items in {:.3f}s".format(name, scale, size, seconds))
+        self.results.setdefault(name, {})[scale] = {'size': size,
+                                                    'seconds': seconds,
+                                                    'min': min(times),
+                                                    'runs': len(times),
+                                                    'perItem': seconds / size if size else None}
+
+    def summary(self):
+        ''' Timings by benchmark name and scale, along with each benchmark's scaling exponent '''
+        ret = {}
+        for name, timings in self.results.items():
+            ret[name] = {'scales': dict([(str(scale), timing) for scale, timing in timings.items()]),
+                         'exponent': ScalingBenchmark.exponent(list(timings.values()))}
+        return ret
+
+    @staticmethod
+    def exponent(timings):
+        ''' Slope of log(seconds) over log(size), 1 for linear scaling '''
+        timings = [t for t in timings if t['size'] and t['seconds'] > 0]
+        sizes = set([t['size'] for t in timings])
+        if len(sizes) < 2:
+            return None
+        slope, _ = np.polyfit(np.log([t['size'] for t in timings]),
+                              np.log([t['seconds'] for t in timings]), 1)
+        return float(slope)
+
+    def reader(self, fmt, replica_fn):
+        if fmt == 'reverb':
+            return ReVerbReader(raw_sents_file = ScalingBenchmark.rawSentencesFilename(replica_fn))
+        return READERS[fmt]()
+
+    @staticmethod
+    def readOie(reader, fn):
+        reader.read(fn)
+        return reader.oie
+
+    def replicate(self, fmt, input_fn, scale):
+        ''' Write scale replicas of input_fn, in the given format, into the work directory.
+            The first replica is the original input, and the sentences of the k-th replica
+            are suffixed by replicaSentence. Returns the replicated file's name. '''
+        replica_fn = os.path.join(self.workdir, '{}.x{}{}'.format(os.path.basename(input_fn), scale,
+                                                                  os.path.splitext(input_fn)[1]))
+        with open(input_fn) as fin:
+            lines = fin.readlines()
+        if fmt == 'reverb':
+            # ReVerb outputs refer to the lines of the raw sentences file
+            with open(ReVerbReader.RAW_SENTS_FILE) as fin:
+                rawSentences = [line.rstrip('\n') for line in fin]
+            with open(ScalingBenchmark.rawSentencesFilename(replica_fn), 'w') as fout:
+                for k in range(scale):
+                    for sent in rawSentences:
+                        fout.write(replicaSentence(sent, k) + '\n')
+
+        with open(replica_fn, 'w') as fout:
+            for k in range(scale):
+                fout.writelines(replicaLines(fmt, lines, k, len(rawSentences) if fmt == 'reverb' else 0))
+        return replica_fn
+
+    def removeReplica(self, fmt, replica_fn):
+        os.remove(replica_fn)
+        if fmt == 'reverb':
+            os.remove(ScalingBenchmark.rawSentencesFilename(replica_fn))
+
+    @staticmethod
+    def rawSentencesFilename(replica_fn):
+        return replica_fn + '.sents'
+
+    # CONSTANTS
+    MATCHERS = [Matcher.lexicalMatch, Matcher.bowMatch, Matcher.bleuMatch, Matcher.fastBleuMatch]
+    # Column holding the sentence, in formats which have one per extraction
+    SENTENCE_COLUMNS = {'gold': 0,
+                        'stanford': 12,
+                        'ollie': 6,
+                        'openiefour': 5,
+                        'props': 1}
+    # Benchmarks are repeated until their total time exceeds this (in seconds), or up to --repeat times
+    MIN_TOTAL_TIME = 1.0
+
+def replicaLine(line, k, sentenceColumn, indexColumn = None, numSentences = 0):
+    ''' Replace the sentence in a tab separated line with its k-th replica.
+        If indexColumn is given, it holds a (1-based) sentence index, which is shifted
+        by k * numSentences. Lines without a sentence column are kept as they are. '''
+    data = line.rstrip('\n').split('\t')
+    if len(data) <= sentenceColumn:
+        return line
+    data[sentenceColumn] = replicaSentence(data[sentenceColumn], k)
+    if indexColumn is not None:
+        data[indexColumn] = str(int(data[indexColumn]) + k * numSentences)
+    return '\t'.join(data) + '\n'
+
+def replicaLines(fmt, lines, k, numSentences = 0):
+    ''' The k-th replica of the lines of a file in the given format (a key of READERS, gold or qasrl).
+        numSentences is the number of raw sentences which ReVerb outputs refer to. '''
+    if fmt == 'ollie':
+        # Only the first replica has the header
+        return ([] if k else lines[:1]) + [replicaLine(line, k, ScalingBenchmark.SENTENCE_COLUMNS[fmt])
+                                           for line in lines[1:]]
+    if fmt == 'reverb':
+        return [replicaLine(line, k, 12, indexColumn = 1, numSentences = numSentences) for line in lines]
+    if fmt == 'clausie':
+        # Sentences are lines of their own, followed by their extractions
+        return [replicaLine(line, k, 0) if len(line.strip().split('\t')) == 1 else line
+                for line in lines]
+    if fmt == 'qasrl':
+        return list(replicaQASRLLines(lines, k))
+    return [replicaLine(line, k, ScalingBenchmark.SENTENCE_COLUMNS[fmt]) for line in lines]
+
+def replicaQASRLLines(lines, k):
+    ''' QA-SRL records start with an ID line, followed by the sentence, and end with an empty line '''
+    recordLine = 0
+    for line in lines:
+        if not line.startswith('#'):
+            if recordLine == 1:
+                line = replicaSentence(line.rstrip('\n'), k) + '\n'
+            recordLine = (recordLine + 1) if line.strip() else 0
+        yield line
+
+def gitCommit():
+    ''' The current commit of this repository, if it's available '''
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       cwd = os.path.dirname(os.path.abspath(__file__)),
+                                       stderr = subprocess.DEVNULL).decode('utf8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compareToBaseline(results, baseline):
+    ''' Log the ratio of each benchmark's time to its time in the baseline '''
+    for name in sorted(results):
+        for scale, timing in sorted(results[name]['scales'].items(), key = lambda x: int(x[0])):
+            previous = baseline.get(name, {}).get('scales', {}).get(scale)
+            if (not previous) or (previous['size'] != timing['size']) or (not previous['seconds']):
+                continue
+            ratio = timing['seconds'] / previous['seconds']
+            log = logging.warning if ratio > 1 + BASELINE_TOLERANCE else logging.info
+            log("{} x{}: {:.3f}s, {:.2f} times the baseline ({:.3f}s)".format(name, scale, timing['seconds'],
+                                                                              ratio, previous['seconds']))
+
+STAGES = ['read', 'match', 'compare', 'qa2oie']
+# Slowdowns beyond this ratio are logged as warnings
+BASELINE_TOLERANCE = 0.2
+
+
+## MAIN
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.INFO)
+    args = docopt(__doc__)
+    logging.debug(args)
+    # BLEU warns about every pair which has no overlapping n-grams
+    warnings.filterwarnings('ignore', module = 'nltk.translate.bleu_score')
+
+    stages = args['STAGE'] or STAGES
+    for stage in stages:
+        if stage not in STAGES:
+            raise ValueError("Unknown stage {}, should be one of {}".format(stage, STAGES))
+    scales = [int(scale) for scale in args['--scales'].split(',')]
+    workdir = args['--workdir'] or tempfile.mkdtemp(prefix = 'scaling_benchmark')
+    if not os.path.exists(workdir):
+        os.makedirs(workdir)
+
+    try:
+        scaling = ScalingBenchmark(args['--gold'],
+                                   readManifest(args['--manifest']),
+                                   workdir = workdir,
+                                   repeat = int(args['--repeat']))
+        results = scaling.run(stages, scales,
+                              qasrl_fn = args['--qasrl'],
+                              dist_file = args['--dist'] or "")
+    finally:
+        if not args['--workdir']:
+            shutil.rmtree(workdir)
+
+    with open(args['--out'], 'w') as fout:
+        json.dump({'commit': gitCommit(),
+                   'python': sys.version.split()[0],
+                   'scales': scales,
+                   'benchmarks': results},
+                  fout, indent = 2, sort_keys = True)
+
+    if args['--baseline']:
+        with open(args['--baseline']) as fin:
+            compareToBaseline(results, json.load(fin)['benchmarks'])
@@ -0,0 +1,82 @@
+"""
+Approximate alignment of sentences across tokenizations.
+Sentence keys are represented by MinHash signatures of their character shingles, and indexed with
+locality sensitive hashing (LSH), so that a key which has no exact match can be mapped to its most
+similar indexed key in (roughly) constant time.
+"""
+import zlib
+from functools import lru_cache
+import numpy as np
+
+class SentenceAligner:
+    ''' MinHash LSH index over a set of sentence keys '''
+    def __init__(self, keys, threshold = None):
+        '''
+        keys - the (normalized) sentence keys to align to
+        threshold - minimal Jaccard similarity of shingles for an alignment
+        '''
+        self.keys = list(keys)
+        self.threshold = SentenceAligner.THRESHOLD if threshold is None else threshold
+        # Bounded, so that aligning a stream of sentences takes constant memory
+        self.align = lru_cache(maxsize = SentenceAligner.CACHE_SIZE)(self.findAlignment)
+        self.shingleSets = [SentenceAligner.shingles(key) for key in self.keys]
+        # One bucket dictionary per band
+        self.buckets = [{} for _ in range(SentenceAligner.NUM_BANDS)]
+        for i, shingleSet in enumerate(self.shingleSets):
+            for band, bucket in zip(self.bands(shingleSet), self.buckets):
+                bucket.setdefault(band, []).append(i)
+
+    def findAlignment(self, key):
+        ''' The most similar indexed key to the given key, or None if none is similar enough.
+            Candidates share at least one LSH band with the key, and are ranked by their actual
+            (rather than estimated) similarity. Memoized as align. '''
+        shingleSet = SentenceAligner.shingles(key)
+        candidates = set([i
+                          for band, bucket in zip(self.bands(shingleSet), self.buckets)
+                          for i in bucket.get(band, [])])
+        best = None
+        bestSimilarity = 0
+        # Ties go to the first indexed key
+        for i in sorted(candidates):
+            similarity = SentenceAligner.jaccard(shingleSet, self.shingleSets[i])
+            if (similarity >= self.threshold) and (similarity > bestSimilarity):
+                best, bestSimilarity = i, similarity
+        return None if best is None else self.keys[best]
+
+    def bands(self, shingleSet):
+        ''' The LSH bands of a shingle set's MinHash signature, as hashable byte strings '''
+        signature = SentenceAligner.minHash(shingleSet)
+        return [signature[i:i + SentenceAligner.BAND_SIZE].tobytes()
+                for i in range(0, len(signature), SentenceAligner.BAND_SIZE)]
+
+    @staticmethod
+    def minHash(shingleSet):
+        ''' Minimum of each of the hash functions over the shingles.
+            Hash functions are multiply-shift hashes, (a * x + b) mod 2^64 >> 32 '''
+        x = np.fromiter(shingleSet, dtype = np.uint64, count = len(shingleSet))
+        hashes = (SentenceAligner.HASH_A[:, np.newaxis] * x + SentenceAligner.HASH_B[:, np.newaxis]) >> np.uint64(32)
+        return hashes.min(axis = 1)
+
+    @staticmethod
+    def shingles(key):
+        ''' Set of (hashed) character n-grams of a key, short keys are a single shingle '''
+        n = SentenceAligner.SHINGLE_SIZE
+        return set([zlib.crc32(key[i:i + n].encode('utf8'))
+                    for i in range(max(1, len(key) - n + 1))])
+
+    @staticmethod
+    def jaccard(s1, s2):
+        return len(s1 & s2) / float(len(s1 | s2))
+
+    # CONSTANTS
+    SHINGLE_SIZE = 4
+    # Signatures of NUM_BANDS * BAND_SIZE hashes, keys with a similarity of s
+    # share a band with a probability of 1 - (1 - s^BAND_SIZE)^NUM_BANDS
+    NUM_BANDS = 16
+    BAND_SIZE = 4
+    THRESHOLD = 0.8
+    # Number of memoized alignments
+    CACHE_SIZE = 1 << 16
+    # Fixed, so that alignments are reproducible
+    HASH_A = np.random.RandomState(0).randint(1, 1 << 62, size = NUM_BANDS * BAND_SIZE, dtype = np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+    HASH_B = np.random.RandomState(1).randint(0, 1 << 62, size = NUM_BANDS * BAND_SIZE, dtype = np.int64).astype(np.uint64)
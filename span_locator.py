@@ -0,0 +1,98 @@
+"""
+Locate the occurrences of many substrings in a single sentence.
+Matches the offsets returned by qa_to_oie.all_index, while normalizing the sentence once
+and scanning it once for all of the substrings (with an Aho-Corasick automaton).
+"""
+from collections import deque
+
+class SpanLocator:
+    ''' Occurrences of a set of patterns in a string, found in a single pass '''
+    def __init__(self, s, patterns, matchCase = True, ignoreSpaces = True):
+        '''
+        s - the string to search in
+        patterns - all substrings which will be looked up with find
+        matchCase, ignoreSpaces - normalization of both the string and the patterns, as in all_index
+        '''
+        self.matchCase = matchCase
+        self.ignoreSpaces = ignoreSpaces
+        self.s = self.normalize(s)
+        self.occurrences = SpanLocator.scan(self.s,
+                                            set([p for p in map(self.normalize, patterns) if p]))
+        self.spans = {}
+
+    def find(self, ss):
+        ''' Start offsets of the non-overlapping occurrences of ss, as returned by all_index '''
+        ss = self.normalize(ss)
+        if not ss:
+            # Like re.finditer, the empty string matches at every position
+            return list(range(len(self.s) + 1))
+        if ss not in self.spans:
+            starts = self.occurrences.get(ss)
+            if starts is None:
+                # Not given in advance
+                starts = SpanLocator.scan(self.s, [ss])[ss]
+            self.spans[ss] = SpanLocator.nonOverlapping(starts, len(ss))
+        return list(self.spans[ss])
+
+    def normalize(self, s):
+        if not self.matchCase:
+            s = s.lower()
+        if self.ignoreSpaces:
+            s = s.replace(' ', '')
+        return s
+
+    @staticmethod
+    def scan(s, patterns):
+        ''' Map each (non empty) pattern to the ascending start offsets of all of its,
+            possibly overlapping, occurrences in s '''
+        goto, fail, output = SpanLocator.automaton(patterns)
+        ret = dict([(p, []) for p in patterns])
+        node = 0
+        for i, c in enumerate(s):
+            while node and (c not in goto[node]):
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            for p in output[node]:
+                ret[p].append(i - len(p) + 1)
+        return ret
+
+    @staticmethod
+    def automaton(patterns):
+        ''' Aho-Corasick automaton, as (goto, fail, output) lists indexed by state (0 is the root) '''
+        goto = [{}]
+        output = [[]]
+        for p in patterns:
+            node = 0
+            for c in p:
+                nxt = goto[node].get(c)
+                if nxt is None:
+                    nxt = goto[node][c] = len(goto)
+                    goto.append({})
+                    output.append([])
+                node = nxt
+            output[node].append(p)
+
+        # Breadth first, so that each state's failure state is computed before its children's
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and (c not in goto[f]):
+                    f = fail[f]
+                fail[nxt] = goto[f].get(c, 0) if node else 0
+                output[nxt] = output[nxt] + output[fail[nxt]]
+        return goto, fail, output
+
+    @staticmethod
+    def nonOverlapping(starts, length):
+        ''' Leftmost occurrences which don't overlap, as found by re.finditer for a fixed string '''
+        ret = []
+        end = 0
+        for start in starts:
+            if start >= end:
+                ret.append(start)
+                end = start + length
+        return ret
@@ -0,0 +1,59 @@
+""" Usage:
+    startup_benchmark [--repeat=REPEAT] [--out=OUTPUT_FILE] [MODULE]...
+
+    Measure the time it takes to import the given modules (by default, the entry points of this
+    package), each in a fresh interpreter. Short scoring runs are dominated by this time,
+    so heavy libraries and corpora should be loaded only when they're used.
+
+Options:
+  --repeat=REPEAT      Number of times each module is imported [default: 5].
+  --out=OUTPUT_FILE    Also write the timings, in seconds, to this JSON file.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import subprocess
+from docopt import docopt
+
+def importTimes(module, repeat):
+    ''' Wall time of starting an interpreter and importing module, in each of repeat runs '''
+    ret = []
+    for _ in range(repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', 'import {}'.format(module)],
+                              cwd = os.path.dirname(os.path.abspath(__file__)))
+        ret.append(time.time() - start)
+    return ret
+
+def summarize(times):
+    times = sorted(times)
+    return {'min': times[0],
+            'median': times[len(times) // 2],
+            'max': times[-1]}
+
+# Entry points, and the modules they import
+MODULES = ['benchmark', 'matcher', 'qa_to_oie', 'create_oie_corpus', 'lemma_table', 'gold_index']
+
+
+## MAIN
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.INFO)
+    args = docopt(__doc__)
+    logging.debug(args)
+    repeat = int(args['--repeat'])
+
+    # The bare interpreter's startup time is the baseline for all imports
+    results = {'python': summarize(importTimes('sys', repeat))}
+    for module in args['MODULE'] or MODULES:
+        results[module] = summarize(importTimes(module, repeat))
+
+    for module, summary in sorted(results.items()):
+        logging.info("{:<20} median {:.3f}s (min {:.3f}s, max {:.3f}s)".format(module,
+                                                                              summary['median'],
+                                                                              summary['min'],
+                                                                              summary['max']))
+    if args['--out']:
+        with open(args['--out'], 'w') as fout:
+            json.dump(results, fout, indent = 2, sort_keys = True)
@@ -0,0 +1,288 @@
+""" Usage:
+    synthetic_corpus --gold=GOLD_OIE --outdir=OUTPUT_DIR [--samples=MANIFEST] [--sentences=SENTENCES] [--extractions=EXTRACTIONS] [--match-rate=RATE] [--confidence=DIST] [--distractor-confidence=DIST] [--seed=SEED] [--formats=FORMATS] [--check]
+
+    Generate a synthetic gold Open IE file, along with system outputs in each of the formats
+    supported by benchmark.py, of any size. Each synthetic sentence is a gold sentence (renamed
+    when the gold is exhausted, see replicaSentence), and its predicted extractions either copy
+    one of its gold extractions (and are thus matched by the benchmark), or are distractors taken
+    from the sample system outputs. The same predictions are written in every format, one sentence
+    at a time, and the output is determined by the seed.
+    Writes OUTPUT_DIR/gold.oie, OUTPUT_DIR/FORMAT.txt for each format and OUTPUT_DIR/raw_sentences.txt,
+    the input sentences to which the ReVerb output refers (instead of ./raw_sentences/all.txt).
+
+Options:
+  --gold=GOLD_OIE                  The gold Open IE file from which sentences and matching extractions are taken.
+  --outdir=OUTPUT_DIR              Where to write the generated files.
+  --samples=MANIFEST               Manifest of system outputs (as accepted by benchmark.py) from which distractors are taken [default: ./systems_output/systems.tsv].
+  --sentences=SENTENCES            Number of sentences to generate (defaults to the number of gold sentences).
+  --extractions=EXTRACTIONS        Mean number of predicted extractions per sentence (Poisson distributed) [default: 4].
+  --match-rate=RATE                Probability of each predicted extraction to copy a gold extraction [default: 0.5].
+  --confidence=DIST                Distribution of the confidence of copied extractions, either uniform or beta:A,B [default: uniform].
+  --distractor-confidence=DIST     Distribution of the confidence of distractors (defaults to that of copied extractions).
+  --seed=SEED                      Random seed [default: 0].
+  --formats=FORMATS                Comma separated system output formats to write (defaults to all of benchmark.py's formats).
+  --check                          Read back each output with its reader, and verify that it holds the generated extractions.
+"""
+import os
+import logging
+from itertools import zip_longest
+from collections import OrderedDict
+import numpy as np
+
+from benchmark import READERS, readManifest
+from oie_readers.reVerbReader import ReVerbReader
+
+class SyntheticCorpus:
+    ''' Deterministic generator of gold and predicted extractions, derived from real samples '''
+    def __init__(self, gold_fn, samples, numSentences = None, extractionsPerSentence = 4.0,
+                 matchRate = 0.5, confidence = 'uniform', distractorConfidence = None, seed = 0):
+        '''
+        gold_fn - gold Open IE file, providing the sentences and the extractions which match them
+        samples - (format, input filename) of system outputs, providing the distractors
+        numSentences - number of sentences to generate, defaults to the number of gold sentences
+        extractionsPerSentence - mean number of predicted extractions per sentence
+        matchRate - probability of each predicted extraction to copy a gold extraction
+        confidence, distractorConfidence - specification of confidence distributions (see confidenceSampler)
+        seed - determines all of the generated output
+        '''
+        self.goldSentences = SyntheticCorpus.readGold(gold_fn)
+        self.distractors = SyntheticCorpus.readDistractors(samples)
+        self.numSentences = len(self.goldSentences) if numSentences is None else numSentences
+        self.extractionsPerSentence = extractionsPerSentence
+        self.matchRate = matchRate
+        self.confidence = confidenceSampler(confidence)
+        self.distractorConfidence = confidenceSampler(distractorConfidence or confidence)
+        self.seed = seed
+
+    def sentences(self):
+        ''' Yields the (sentence, gold rows, predicted extractions) of each synthetic sentence,
+            where gold rows are the fields of its gold file lines, and predicted extractions
+            are (predicate, arguments, confidence) tuples '''
+        rng = np.random.RandomState(self.seed)
+        for i in range(self.numSentences):
+            sent, goldRows = self.goldSentences[i % len(self.goldSentences)]
+            sent = replicaSentence(sent, i // len(self.goldSentences))
+            # Gold extractions which can be written in binary formats as well
+            candidates = [row for row in goldRows if len(row) >= 5]
+
+            count = rng.poisson(self.extractionsPerSentence)
+            # All draws are made regardless of their outcome, so that the stream of random
+            # numbers (and thus the output) depends only on the seed and the parameters
+            isCopy = rng.random_sample(count) < self.matchRate
+            copies = rng.randint(max(len(candidates), 1), size = count)
+            distractors = rng.randint(len(self.distractors), size = count)
+            confidences = np.where(isCopy, self.confidence(rng, count), self.distractorConfidence(rng, count))
+
+            predicted = []
+            for j in range(count):
+                if isCopy[j] and candidates:
+                    row = candidates[copies[j]]
+                    pred, args = row[2], row[3:]
+                else:
+                    pred, args = self.distractors[distractors[j]]
+                predicted.append((pred, args, float(confidences[j])))
+            yield sent, [[sent] + row[1:] for row in goldRows], predicted
+
+    def write(self, outdir, formats):
+        ''' Write the gold, and the predictions in each of the given formats (keys of WRITERS), into outdir.
+            Returns the names of the written system outputs, by format. '''
+        if not os.path.exists(outdir):
+            os.makedirs(outdir)
+        outputs = OrderedDict([(fmt, os.path.join(outdir, '{}.txt'.format(fmt))) for fmt in formats])
+        files = dict([(fmt, open(fn, 'w')) for fmt, fn in outputs.items()])
+        try:
+            with open(os.path.join(outdir, 'gold.oie'), 'w') as goldOut, \
+                 open(SyntheticCorpus.rawSentencesFilename(outdir), 'w') as rawOut:
+                if 'ollie' in files:
+                    files['ollie'].write(OLLIE_HEADER)
+                for i, (sent, goldRows, predicted) in enumerate(self.sentences()):
+                    rawOut.write(sent + '\n')
+                    for row in goldRows:
+                        goldOut.write('\t'.join(row) + '\n')
+                    for fmt, fout in files.items():
+                        WRITERS[fmt](fout, i, sent, predicted)
+        finally:
+            for fout in files.values():
+                fout.close()
+        return outputs
+
+    def check(self, fmt, input_fn, outdir):
+        ''' Verify that reading input_fn with fmt's reader yields the generated extractions, in order.
+            Confidences of readers which normalize them are only checked for their order.
+            Returns the number of verified extractions. '''
+        if fmt == 'reverb':
+            reader = ReVerbReader(raw_sents_file = SyntheticCorpus.rawSentencesFilename(outdir))
+        else:
+            reader = READERS[fmt]()
+        expected = ((sent, pred, SyntheticCorpus.formatArgs(fmt, args), confidence)
+                    for sent, _, predicted in self.sentences()
+                    for pred, args, confidence in predicted)
+        count = 0
+        prev = None
+        for ex, generated in zip_longest(reader.iterExtractions(input_fn), expected):
+            if (ex is None) or (generated is None):
+                raise ValueError("{}: {} extractions after the first {}".format(input_fn,
+                                                                                 'missing' if ex is None else 'unexpected',
+                                                                                 count))
+            sent, pred, args, confidence = generated
+            if (ex.sent, ex.pred, ex.args) != (sent, pred, args):
+                raise ValueError("{}: extraction {} is {}, expected {}".format(input_fn, count,
+                                                                               (ex.sent, ex.pred, ex.args),
+                                                                               (sent, pred, args)))
+            if fmt in NORMALIZING_FORMATS:
+                # Normalization is monotonic
+                if (prev is not None) and (np.sign(ex.confidence - prev[0]) != np.sign(confidence - prev[1])):
+                    raise ValueError("{}: confidence of extraction {} is out of order".format(input_fn, count))
+                prev = (ex.confidence, confidence)
+            elif ex.confidence != confidence:
+                raise ValueError("{}: confidence of extraction {} is {}, expected {}".format(input_fn, count,
+                                                                                            ex.confidence, confidence))
+            count += 1
+        return count
+
+    @staticmethod
+    def formatArgs(fmt, args):
+        ''' Arguments as written in (and read from) the given format '''
+        if fmt == 'props':
+            return list(args)
+        return list(binaryArgs(args))
+
+    @staticmethod
+    def readGold(gold_fn):
+        ''' Gold sentences, in order, each with the fields of its lines '''
+        ret = OrderedDict()
+        with open(gold_fn) as fin:
+            for line in fin:
+                data = line.strip().split('\t')
+                data = [data[0]] + [field.strip() for field in data[1:]]
+                ret.setdefault(data[0], []).append(data)
+        return list(ret.items())
+
+    @staticmethod
+    def readDistractors(samples):
+        ''' (predicate, arguments) of the extractions in the sample outputs, given as (format, input filename).
+            Arguments are stripped, and empty ones are removed. Samples which don't exist are skipped. '''
+        ret = []
+        for fmt, input_fn in samples:
+            if not os.path.exists(input_fn):
+                logging.warning("Skipping sample {}, which doesn't exist".format(input_fn))
+                continue
+            for ex in READERS[fmt]().iterExtractions(input_fn):
+                args = [arg.strip() for arg in ex.args if arg.strip()]
+                if ex.pred.strip() and args:
+                    ret.append((ex.pred.strip(), args))
+        if not ret:
+            raise ValueError("No distractors found in the samples")
+        return ret
+
+    @staticmethod
+    def rawSentencesFilename(outdir):
+        return os.path.join(outdir, 'raw_sentences.txt')
+
+def replicaSentence(sent, k):
+    ''' The sentence of the k-th replica, the original sentence for k = 0 '''
+    if not k:
+        return sent
+    return '{} replica{}'.format(sent, k)
+
+def confidenceSampler(spec):
+    ''' Function drawing n confidences with a random state, given either uniform or beta:A,B '''
+    if spec == 'uniform':
+        return lambda rng, n: rng.random_sample(n)
+    if spec.startswith('beta:'):
+        a, b = [float(x) for x in spec[len('beta:'):].split(',')]
+        return lambda rng, n: rng.beta(a, b, size = n)
+    raise ValueError("Unknown confidence distribution {}, should be uniform or beta:A,B".format(spec))
+
+def binaryArgs(args):
+    ''' Arguments of binary formats: the first argument, and all of the others joined '''
+    return args[0], ' '.join(args[1:])
+
+# Writers of each format, each writes the predicted extractions of the i-th sentence
+
+def writeStanford(fout, i, sent, predicted):
+    for pred, args, confidence in predicted:
+        arg1, arg2 = binaryArgs(args)
+        fout.write('\t'.join(['synthetic', str(i + 1), arg1, pred, arg2] + ['0'] * 6 +
+                             [repr(confidence), sent]) + '\n')
+
+def writeOllie(fout, i, sent, predicted):
+    for pred, args, confidence in predicted:
+        arg1, arg2 = binaryArgs(args)
+        fout.write('\t'.join([repr(confidence), arg1, pred, arg2, '', '', sent]) + '\n')
+
+def writeReVerb(fout, i, sent, predicted):
+    # Sentences are referred to by their (1-based) line in the raw sentences file
+    for pred, args, confidence in predicted:
+        arg1, arg2 = binaryArgs(args)
+        fout.write('\t'.join(['synthetic', str(i + 1), arg1, pred, arg2] + ['0'] * 6 +
+                             [repr(confidence), sent]) + '\n')
+
+def writeClausie(fout, i, sent, predicted):
+    # A sentence line, followed by its extractions
+    fout.write(sent + '\n')
+    for pred, args, confidence in predicted:
+        arg1, arg2 = binaryArgs(args)
+        fout.write('{}\t"{}"\t"{}"\t"{}"\t{!r}\n'.format(i + 1, arg1, pred, arg2, confidence))
+
+def writeOpenieFour(fout, i, sent, predicted):
+    for pred, args, confidence in predicted:
+        arg1, arg2 = binaryArgs(args)
+        fout.write('\t'.join([repr(confidence), '',
+                              'SimpleArgument({},List({}))'.format(arg1, span(sent, arg1)),
+                              'Relation({},List({}))'.format(pred, span(sent, pred)),
+                              'SimpleArgument({},List({}))'.format(arg2, span(sent, arg2)),
+                              sent]) + '\n')
+
+def writeProps(fout, i, sent, predicted):
+    for pred, args, confidence in predicted:
+        fields = [repr(confidence), sent, pred]
+        for arg in args:
+            fields += ['arg', arg]
+        fout.write('\t'.join(fields) + '\n')
+
+def span(sent, s):
+    ''' Character span of s in sent, as written by OpenIE-4 (the start of sent if it's not found) '''
+    start = max(sent.find(s), 0)
+    return '[{}, {})'.format(start, start + len(s))
+
+WRITERS = OrderedDict([('clausie', writeClausie),
+                       ('ollie', writeOllie),
+                       ('openiefour', writeOpenieFour),
+                       ('props', writeProps),
+                       ('reverb', writeReVerb),
+                       ('stanford', writeStanford)])
+
+# Formats whose readers normalize confidences (see OieReader.normalizedExtractions)
+NORMALIZING_FORMATS = set(['clausie', 'props'])
+OLLIE_HEADER = '\t'.join(['confidence', 'arg1', 'relation', 'arg2', 'enabler', 'attribution',
+                          'text', 'pattern', 'dependencies']) + '\n'
+
+
+## MAIN
+if __name__ == '__main__':
+    from docopt import docopt
+    logging.basicConfig(level = logging.INFO)
+    args = docopt(__doc__)
+    logging.debug(args)
+
+    formats = args['--formats'].split(',') if args['--formats'] else list(WRITERS)
+    for fmt in formats:
+        if fmt not in WRITERS:
+            raise ValueError("Unknown format {}, should be one of {}".format(fmt, list(WRITERS)))
+
+    corpus = SyntheticCorpus(args['--gold'],
+                             [(fmt, input_fn) for fmt, input_fn, _ in readManifest(args['--samples'])],
+                             numSentences = int(args['--sentences']) if args['--sentences'] else None,
+                             extractionsPerSentence = float(args['--extractions']),
+                             matchRate = float(args['--match-rate']),
+                             confidence = args['--confidence'],
+                             distractorConfidence = args['--distractor-confidence'],
+                             seed = int(args['--seed']))
+    outputs = corpus.write(args['--outdir'], formats)
+    logging.info("Wrote {} sentences to {}".format(corpus.numSentences, args['--outdir']))
+
+    if args['--check']:
+        for fmt, output_fn in outputs.items():
+            logging.info("{}: verified {} extractions".format(output_fn,
+                                                               corpus.check(fmt, output_fn, args['--outdir'])))
@@ -0,0 +1,48 @@
+""" Shared fixtures: the modules under test are scripts at the repository's root """
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BRIDGE = "John Smith -LRB- the mayor -RRB- opened the new bridge ."
+COST = "The bridge cost $ 2 million , officials said ."
+PARIS = "Mary and Bob visited Paris ."
+NOTHING = "Nobody extracted anything from this sentence ."
+
+# (sentence, predicate, arguments) of each gold extraction
+GOLD = [(BRIDGE, "opened", ["John Smith", "the new bridge"]),
+        (BRIDGE, "is", ["John Smith", "the mayor"]),
+        (COST, "cost", ["The bridge", "$ 2 million"]),
+        (COST, "said", ["officials", "The bridge cost $ 2 million"]),
+        (PARIS, "visited", ["Mary", "Paris"]),
+        (PARIS, "visited", ["Bob", "Paris"]),
+        (NOTHING, "extracted", ["Nobody", "anything"])]
+
+# (sentence, arg1, relation, arg2, confidence) of each predicted extraction, in Stanford's format.
+# The first sentence is tokenized differently than the gold, the gold's last sentence has no
+# predictions, confidences are tied, "officials said nothing" covers exactly a quarter of its
+# gold extraction (which isn't enough to match it), and the last sentence isn't in the gold.
+PREDICTED = [("John Smith ( the mayor ) opened the new bridge .", "John Smith", "opened", "the new bridge", 0.9),
+             ("John Smith ( the mayor ) opened the new bridge .", "John Smith", "is", "the mayor", 0.9),
+             ("John Smith ( the mayor ) opened the new bridge .", "the bridge", "opened", "John", 0.3),
+             (COST, "The bridge", "cost", "$ 2 million", 0.5),
+             (COST, "officials", "said", "nothing", 0.5),
+             (PARIS, "Mary and Bob", "visited", "Paris", 0.7),
+             ("A sentence which is n't in the gold .", "A sentence", "is n't in", "the gold", 0.8)]
+
+@pytest.fixture
+def gold_fn(tmp_path):
+    ret = str(tmp_path / "gold.oie")
+    with open(ret, 'w') as fout:
+        for sent, pred, args in GOLD:
+            fout.write('\t'.join([sent, pred, pred] + args) + '\n')
+    return ret
+
+@pytest.fixture
+def stanford_fn(tmp_path):
+    ret = str(tmp_path / "stanford.txt")
+    with open(ret, 'w') as fout:
+        for sent, arg1, rel, arg2, confidence in PREDICTED:
+            fout.write('\t'.join(['0', '0', arg1, rel, arg2] + ['0'] * 6 + [str(confidence), sent]) + '\n')
+    return ret
@@ -0,0 +1,82 @@
+"""
+Tests of Benchmark on the gold and predictions of conftest.
+"""
+import os
+import numpy as np
+from benchmark import Benchmark, readManifest, sweepFilename
+from matcher import Matcher
+from oie_readers.stanfordReader import StanfordReader
+
+def readCurve(fn):
+    with open(fn) as fin:
+        return fin.read()
+
+def curvePoints(curve):
+    return [[float(x) for x in line.split('\t')] for line in curve.strip().split('\n')[1:]]
+
+def evaluate(gold_fn, stanford_fn, output_fn, stream = False):
+    reader = StanfordReader()
+    if stream:
+        predicted = reader.iterSentences(stanford_fn)
+    else:
+        reader.read(stanford_fn)
+        predicted = reader.oie
+    Benchmark(gold_fn).compare(predicted = predicted,
+                               matchingFunc = Matcher.lexicalMatch,
+                               output_fn = output_fn)
+    return readCurve(output_fn)
+
+def test_stream(gold_fn, stanford_fn, tmp_path):
+    expected = evaluate(gold_fn, stanford_fn, str(tmp_path / "dict.dat"))
+    assert evaluate(gold_fn, stanford_fn, str(tmp_path / "stream.dat"), stream = True) == expected
+    # 5 of the 7 gold extractions are matched, by 6 evaluated predictions (see conftest)
+    assert np.allclose(curvePoints(expected), [[1, 0], [1, 2 / 7.], [1, 4 / 7.], [5 / 6., 5 / 7.]])
+
+def test_columnar(gold_fn, stanford_fn, tmp_path):
+    expected = evaluate(gold_fn, stanford_fn, str(tmp_path / "dict.dat"))
+    store = StanfordReader().readStore(stanford_fn, vocab = Matcher.vocab)
+    output_fn = str(tmp_path / "columnar.dat")
+    Benchmark(gold_fn).compareStore(store = store,
+                                    matchingFunc = Matcher.lexicalMatch,
+                                    output_fn = output_fn)
+    assert readCurve(output_fn) == expected
+
+# Sentences and their keys: spaces, PTB escapes (even without spaces around them) and
+# ASCII punctuation are removed, other characters are kept
+KEYS = [("John Smith -LRB- the mayor -RRB- opened the new bridge .", "JohnSmiththemayoropenedthenewbridge"),
+        ("John Smith ( the mayor ) opened the new bridge .", "JohnSmiththemayoropenedthenewbridge"),
+        ("x-LRB-y-RSB-z -LCB- w -RCB-", "xyzw"),
+        ("-LRB-LRB-", "LRB"),
+        ("A well-known , self-made man 's house -- or not ?", "Awellknownselfmademanshouseornot"),
+        ("Café — “quotes” !", "Café—“quotes”"),
+        ("  ", ""),
+        ("", "")]
+
+def test_normalize_key():
+    for sent, key in KEYS:
+        assert Benchmark.normalizeKey(sent) == key
+        # As normalized originally, one step at a time
+        assert Benchmark.removePunct(Benchmark.PTB_unescape(sent.replace(' ', ''))) == key
+
+def test_sweep(gold_fn, stanford_fn, tmp_path):
+    output_fn = str(tmp_path / "sweep.dat")
+    reader = StanfordReader()
+    reader.read(stanford_fn)
+    results = Benchmark(gold_fn).sweep(predicted = reader.oie,
+                                       matchingFunc = Matcher.lexicalMatch,
+                                       thresholds = [0.2, Matcher.LEXICAL_THRESHOLD],
+                                       output_fn = output_fn)
+    assert sorted(results) == [0.2, Matcher.LEXICAL_THRESHOLD]
+    # The matcher's own threshold gives the same curve as a plain run
+    assert readCurve(sweepFilename(output_fn, Matcher.LEXICAL_THRESHOLD)) == \
+        evaluate(gold_fn, stanford_fn, str(tmp_path / "plain.dat"))
+    # while a lower threshold also matches "officials said nothing"
+    assert np.allclose(curvePoints(readCurve(sweepFilename(output_fn, 0.2))),
+                       [[1, 0], [1, 2 / 7.], [1, 4 / 7.], [1, 6 / 7.]])
+
+def test_shipped_manifest(monkeypatch):
+    # The manifest's paths are relative to the repository's root
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    systems = readManifest(os.path.join('systems_output', 'systems.tsv'))
+    assert sorted(fmt for fmt, _, _ in systems) == ['clausie', 'openiefour', 'props', 'reverb']
+    assert all(os.path.exists(input_fn) for _, input_fn, _ in systems)
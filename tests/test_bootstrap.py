@@ -0,0 +1,53 @@
+"""
+Tests of the paired bootstrap on two small systems.
+"""
+import numpy as np
+from bootstrap import PairedBootstrap
+from pr_curve import PRCurve
+
+GOLD_COUNTS = [2, 1, 3]
+# (y_true, y_scores, y_sentences) of two systems, with a tie across sentences
+A = ([1, 0, 1, 1], [0.9, 0.8, 0.8, 0.5], [0, 0, 1, 2])
+B = ([1, 1, 1, 0], [0.9, 0.8, 0.8, 0.5], [0, 0, 1, 2])
+
+def fullMetrics(results):
+    y_true, y_scores, _ = results
+    curve = PRCurve(y_true, y_scores, recallMultiplier = sum(y_true) / float(sum(GOLD_COUNTS)))
+    return curve.auc(), curve.maxF1()[0]
+
+def test_replicates():
+    bootstrap = PairedBootstrap(GOLD_COUNTS, numSamples = 50, seed = 1)
+    # Each replicate draws as many sentences as the gold has
+    assert bootstrap.weights.shape == (50, 3)
+    assert (bootstrap.weights.sum(axis = 1) == 3).all()
+    # and is determined by the seed
+    assert (PairedBootstrap(GOLD_COUNTS, numSamples = 50, seed = 1).weights == bootstrap.weights).all()
+
+def test_unit_weights_match_pr_curve():
+    auc, f1 = PairedBootstrap.weightedMetrics(A, np.ones((1, 3), dtype = np.int64),
+                                              np.array(GOLD_COUNTS, dtype = float))
+    assert np.allclose([auc[0], f1[0]], fullMetrics(A))
+
+def test_compare():
+    comparison = PairedBootstrap(GOLD_COUNTS, numSamples = 200).compare(A, B)
+    assert sorted(comparison) == sorted(PairedBootstrap.METRICS)
+    for m, name in enumerate(PairedBootstrap.METRICS):
+        valueA, valueB, (low, high), pValue = comparison[name]
+        assert np.allclose([valueA, valueB], [fullMetrics(A)[m], fullMetrics(B)[m]])
+        assert low <= high
+        assert 0 <= pValue <= 1
+
+def test_compare_to_itself():
+    for valueA, valueB, interval, pValue in PairedBootstrap(GOLD_COUNTS, numSamples = 200).compare(A, A).values():
+        assert valueA == valueB
+        assert interval == (0, 0)
+        assert pValue == 1
+
+def test_p_value_is_never_zero():
+    # None of the 99 differences favors A, which 99 samples bound at p = 2 / 100
+    interval, pValue = PairedBootstrap.summarize(np.arange(1, 100, dtype = float))
+    assert np.isclose(pValue, 0.02)
+    assert interval[0] > 0
+    interval, pValue = PairedBootstrap.summarize(-np.arange(1, 100, dtype = float))
+    assert np.isclose(pValue, 0.02)
+    assert interval[1] < 0
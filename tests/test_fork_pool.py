@@ -0,0 +1,23 @@
+"""
+Tests of the process pool shared by benchmark.py and create_oie_corpus.py.
+"""
+import os
+from fork_pool import forkMap
+
+# Set before the pool is created, as Benchmark.compareSystems sets its gold
+_offset = None
+
+def work(job):
+    return job + _offset, os.getpid()
+
+def test_fork_map():
+    global _offset
+    _offset = 10
+    jobs = list(range(5))
+    results = forkMap(work, jobs, numJobs = 2)
+    # In order, and computed by the forked processes, which inherited _offset
+    assert [value for value, _ in results] == [10, 11, 12, 13, 14]
+    assert os.getpid() not in set(pid for _, pid in results)
+    # A single process runs the jobs itself
+    assert forkMap(work, jobs, numJobs = 1) == [(value, os.getpid()) for value in range(10, 15)]
+    assert forkMap(work, [], numJobs = 2) == []
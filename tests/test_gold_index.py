@@ -0,0 +1,55 @@
+"""
+Tests of the gold index: it loads what the text gold holds, and is rebuilt when stale.
+"""
+import os
+import pickle
+import matcher
+from gold_index import GoldIndex
+from benchmark import Benchmark
+from oie_readers.goldReader import GoldReader
+
+def contents(gold, normalizedGold):
+    return ([(sent, [(ex.pred, ex.args, ex.bowWords()) for ex in gold[sent]]) for sent in gold],
+            list(normalizedGold))
+
+def parsed(gold_fn):
+    gr = GoldReader()
+    gr.read(gold_fn)
+    return ([(sent, [(ex.pred, ex.args, ex.bowWords()) for ex in extractions])
+             for sent, extractions in gr.oie.items()],
+            [Benchmark.normalizeKey(sent) for sent in gr.oie])
+
+def test_index_matches_text(gold_fn):
+    index = GoldIndex(gold_fn, Benchmark.normalizeKey)
+    # Built on the first load, and read on the second
+    assert contents(*index.load()) == parsed(gold_fn)
+    assert os.path.exists(gold_fn + GoldIndex.SUFFIX)
+    assert contents(*index.load()) == parsed(gold_fn)
+
+def test_rebuilt_when_gold_changes(gold_fn):
+    GoldIndex(gold_fn, Benchmark.normalizeKey).load()
+    with open(gold_fn, 'a') as fout:
+        fout.write('\t'.join(["A new sentence .", "is", "is", "A", "new sentence"]) + '\n')
+    assert contents(*GoldIndex(gold_fn, Benchmark.normalizeKey).load()) == parsed(gold_fn)
+
+def test_rebuilt_when_lemmas_change(gold_fn, monkeypatch):
+    GoldIndex(gold_fn, Benchmark.normalizeKey).load()
+    monkeypatch.setattr(matcher.lemmatizer, 'digest', lambda: 'another table')
+    GoldIndex(gold_fn, Benchmark.normalizeKey).load()
+    with open(gold_fn + GoldIndex.SUFFIX, 'rb') as fin:
+        assert pickle.load(fin)['lemmas'] == 'another table'
+
+def test_unreadable_index(gold_fn):
+    with open(gold_fn + GoldIndex.SUFFIX, 'wb') as fout:
+        fout.write(b'truncated')
+    assert contents(*GoldIndex(gold_fn, Benchmark.normalizeKey).load()) == parsed(gold_fn)
+
+def test_decoded_on_access(gold_fn):
+    GoldIndex(gold_fn, Benchmark.normalizeKey).load()
+    gold, normalizedGold = GoldIndex(gold_fn, Benchmark.normalizeKey).load()
+    key = Benchmark.normalizeKey("Mary and Bob visited Paris .")
+    assert [normalizedGold.count(k) for k in normalizedGold] == [2, 2, 2, 1]
+    assert not normalizedGold.decoded
+    # Both views share the decoded extractions
+    assert normalizedGold[key] is gold["Mary and Bob visited Paris ."]
+    assert len(normalizedGold.decoded) == 1
@@ -0,0 +1,93 @@
+"""
+Tests of the match cache's keys and file, and of its use by Benchmark.compare.
+"""
+import pickle
+import matcher
+from benchmark import Benchmark
+from match_cache import MatchCache
+from matcher import Matcher
+from oie_readers.extraction import Extraction
+from oie_readers.stanfordReader import StanfordReader
+
+def extraction(pred, args, confidence = 1.0, splits_conjunctions = False):
+    ret = Extraction(pred = pred, sent = "", confidence = confidence, splits_conjunctions = splits_conjunctions)
+    for arg in args:
+        ret.addArg(arg)
+    return ret
+
+GOLD_DIGEST = MatchCache.digest([extraction("opened", ["John", "the bridge"])])
+PREDICTED = [extraction("opened", ["John", "the bridge"], 0.9), extraction("is", ["John", "a mayor"], 0.5)]
+
+def key(predicted, goldDigest = GOLD_DIGEST, matchingFunc = Matcher.lexicalMatch, assignment = 'greedy'):
+    return MatchCache.key(matchingFunc, assignment, goldDigest, predicted)
+
+def test_key(monkeypatch):
+    expected = key(PREDICTED)
+    # Confidences aren't part of the key
+    assert key([extraction("opened", ["John", "the bridge"], 0.1), extraction("is", ["John", "a mayor"], 0.2)]) == expected
+    # Everything else is
+    assert key(PREDICTED[::-1]) != expected
+    assert key(PREDICTED[:1]) != expected
+    assert key([PREDICTED[0], extraction("is", ["John", "the mayor"], 0.5)]) != expected
+    assert key([PREDICTED[0], extraction("is", ["John", "a mayor"], 0.5, splits_conjunctions = True)]) != expected
+    assert key(PREDICTED, goldDigest = MatchCache.digest(PREDICTED)) != expected
+    assert key(PREDICTED, matchingFunc = Matcher.bowMatch) != expected
+    assert key(PREDICTED, assignment = 'optimal') != expected
+    monkeypatch.setattr(Matcher, 'LEXICAL_THRESHOLD', 0.5)
+    assert key(PREDICTED) != expected
+
+def test_key_lemmas(monkeypatch):
+    # Lexical matching compares predicates by the lemma table's entries
+    expected = key(PREDICTED)
+    monkeypatch.setattr(matcher.lemmatizer, 'digest', lambda: 'another table')
+    assert key(PREDICTED) != expected
+
+def test_save(tmp_path):
+    cache_fn = str(tmp_path / "system.matches")
+    cache = MatchCache(cache_fn)
+    assert cache.get(b'a') is None
+    cache.put(b'a', ([0], []))
+    cache.put(b'b', ([], [1]))
+    cache.save()
+
+    cache = MatchCache(cache_fn)
+    assert cache.get(b'a') == ([0], [])
+    cache.save()
+    # Entries which weren't used are dropped
+    assert MatchCache(cache_fn).entries == {b'a': ([0], [])}
+
+def test_invalid_cache(tmp_path):
+    cache_fn = str(tmp_path / "system.matches")
+    with open(cache_fn, 'wb') as fout:
+        pickle.dump({'version': MatchCache.VERSION - 1, 'entries': {b'a': ([0], [])}}, fout)
+    assert MatchCache(cache_fn).entries == {}
+    with open(cache_fn, 'wb') as fout:
+        fout.write(b'truncated')
+    assert MatchCache(cache_fn).entries == {}
+
+def test_compare(gold_fn, stanford_fn, tmp_path):
+    def run(output_fn):
+        reader = StanfordReader()
+        reader.read(stanford_fn)
+        cache = MatchCache(MatchCache.cacheFilename(str(tmp_path / "cached.dat")))
+        Benchmark(gold_fn).compare(predicted = reader.oie, matchingFunc = Matcher.lexicalMatch,
+                                   output_fn = output_fn, matchCache = cache)
+        cache.save()
+        with open(output_fn) as fin:
+            return cache, fin.read()
+
+    first, curve = run(str(tmp_path / "first.dat"))
+    second, cachedCurve = run(str(tmp_path / "second.dat"))
+    assert cachedCurve == curve
+    # All 3 evaluated sentences are read from the cache
+    assert len(first.entries) == 0
+    assert set(second.entries) == set(second.used) == set(first.used)
+    assert len(second.used) == 3
+
+    # Only the sentence whose gold changed is matched again
+    with open(gold_fn) as fin:
+        lines = fin.readlines()
+    with open(gold_fn, 'w') as fout:
+        fout.writelines([line.replace("$ 2 million", "$ 3 million") for line in lines])
+    third, _ = run(str(tmp_path / "third.dat"))
+    assert len(set(third.used) & set(second.used)) == 2
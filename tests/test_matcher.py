@@ -0,0 +1,160 @@
+"""
+Tests of the matchers and their batched engines on hand-picked extractions.
+"""
+import itertools
+import pytest
+import numpy as np
+from oie_readers.extraction import Extraction
+from matcher import Matcher, lemmatizer
+
+def extraction(pred, *args):
+    ret = Extraction(pred = pred, sent = "", confidence = float(1))
+    for arg in args:
+        ret.addArg(arg)
+    return ret
+
+# Lexical matching requires the predicates to share a lemma, and a coverage of
+# more than a quarter of the reference's words
+REF = extraction("opened", "John", "the bridge")
+LEXICAL = [extraction("opened", "John"),                   # 2 of 4 words
+           extraction("opened", "Mary"),                   # 1 of 4 words, exactly at the threshold
+           extraction("closed", "John", "the bridge"),     # All other words, with another predicate
+           extraction("opened", "John", "the bridge"),     # The same extraction
+           extraction("visits", "John", "the bridge"),
+           extraction("visit", "John", "the city"),        # Shares the previous predicate by lemma only
+           extraction("opened", "JOHN", "THE BRIDGE"),     # Case isn't ignored, leaving 1 of 4 words
+           extraction("opened", "", "")]
+
+def pairwise(refs, exs):
+    return np.array([[Matcher.lexicalMatch(ref, ex, ignoreStopwords = True, ignoreCase = True)
+                      for ex in exs]
+                     for ref in refs], dtype = bool).reshape(len(refs), len(exs))
+
+def test_lexical_match():
+    assert [Matcher.lexicalMatch(REF, ex, ignoreStopwords = True, ignoreCase = True) for ex in LEXICAL] == \
+        [True, False, False, True, False, False, False, False]
+    assert Matcher.lexicalMatch(LEXICAL[4], LEXICAL[5], ignoreStopwords = True, ignoreCase = True)
+
+def test_lexical_match_matrix():
+    refs = [REF] + LEXICAL
+    assert (Matcher.lexicalMatchMatrix(refs, LEXICAL, ignoreStopwords = True, ignoreCase = True) ==
+            pairwise(refs, LEXICAL)).all()
+
+def test_lexical_first_matches_empty():
+    assert Matcher.firstMatches(Matcher.lexicalMatch, [REF], [], ignoreStopwords = True, ignoreCase = True) == [None]
+    assert Matcher.firstMatches(Matcher.lexicalMatch, [], LEXICAL, ignoreStopwords = True, ignoreCase = True) == []
+
+def test_lexical_first_matches(monkeypatch):
+    refs = [REF] + LEXICAL
+    expected = [next((j for j, match in enumerate(row) if match), None)
+                for row in pairwise(refs, LEXICAL)]
+    # In bulk, and one pair at a time
+    for minBatchPairs in [0, len(refs) * len(LEXICAL) + 1]:
+        monkeypatch.setattr(Matcher, 'MIN_BATCH_PAIRS', minBatchPairs)
+        assert Matcher.firstMatches(Matcher.lexicalMatch, refs, LEXICAL,
+                                    ignoreStopwords = True, ignoreCase = True) == expected
+
+def bestAssignment(scores, threshold, row = 0, used = frozenset()):
+    ''' (number of matches, total score) of the best one-to-one assignment, by exhaustive search '''
+    if row == len(scores):
+        return (0, 0.0)
+    ret = bestAssignment(scores, threshold, row + 1, used)
+    for j, score in enumerate(scores[row]):
+        if (score > threshold) and (j not in used):
+            count, total = bestAssignment(scores, threshold, row + 1, used | set([j]))
+            ret = max(ret, (count + 1, total + score))
+    return ret
+
+def assignmentValue(scores, threshold, assignment):
+    cols = [j for j in assignment if j is not None]
+    assert len(cols) == len(set(cols))
+    assert all(scores[i][j] > threshold for i, j in enumerate(assignment) if j is not None)
+    return (len(cols), sum([scores[i][j] for i, j in enumerate(assignment) if j is not None]))
+
+def test_optimal_matches_above():
+    # Greedy would give the first extraction to the first reference, leaving the second unmatched
+    assert Matcher.optimalMatchesAbove(np.array([[0.9, 0.8], [0.9, -np.inf]]), 0.25) == [1, 0]
+    # Matching more references takes precedence over a higher total score
+    assert Matcher.optimalMatchesAbove(np.array([[1.0, 0.3], [1.0, 0.1]]), 0.25) == [1, 0]
+    # Scores at the threshold don't match
+    assert Matcher.optimalMatchesAbove(np.array([[0.25, 0.5], [0.25, 0.25]]), 0.25) == [1, None]
+
+def test_optimal_matches_above_exhaustive():
+    # Every matrix of these shapes and values, including contested columns and ties
+    values = [-np.inf, 0.25, 0.5, 1.0]
+    for shape, shapeValues in [((2, 3), values), ((3, 2), values), ((3, 3), values[1:])]:
+        for cells in itertools.product(shapeValues, repeat = shape[0] * shape[1]):
+            scores = np.array(cells).reshape(shape)
+            assignment = Matcher.optimalMatchesAbove(scores, 0.25)
+            assert len(assignment) == shape[0]
+            count, total = assignmentValue(scores, 0.25, assignment)
+            bestCount, bestTotal = bestAssignment(scores, 0.25)
+            assert count == bestCount
+            assert abs(total - bestTotal) < 1e-9
+
+def test_optimal_matches(monkeypatch):
+    refs = [REF] + LEXICAL
+    expected = bestAssignment([[Matcher.lexicalScore(ref, ex) for ex in LEXICAL] for ref in refs],
+                              Matcher.LEXICAL_THRESHOLD)
+    for minBatchPairs in [0, len(refs) * len(LEXICAL) + 1]:
+        monkeypatch.setattr(Matcher, 'MIN_BATCH_PAIRS', minBatchPairs)
+        assignment = Matcher.optimalMatches(Matcher.lexicalMatch, refs, LEXICAL,
+                                            ignoreStopwords = True, ignoreCase = True)
+        assert assignmentValue(pairwise(refs, LEXICAL).astype(float), 0, assignment)[0] == expected[0]
+
+BLEU = [extraction("opened", "John", "the new bridge"),
+        extraction("opened", "John", "the new bridge"),                  # Identical
+        extraction("opened", "John", "the new"),                         # Shorter, with a brevity penalty
+        extraction("opened", "John", "the new bridge", "in the city"),   # Longer
+        extraction("the bridge", "the the the"),                         # Repeated words are clipped
+        extraction("opened", "John"),                                    # No 3-grams and 4-grams
+        extraction("closed", "Mary", "an old road")]                     # No common words
+
+# NLTK warns of the pairs which have no overlapping n-grams of some order
+@pytest.mark.filterwarnings('ignore::UserWarning')
+def test_fast_bleu_score():
+    # NLTK's arithmetic is reproduced exactly for a single pair
+    for ref in BLEU:
+        for ex in BLEU:
+            assert Matcher.fastBleuScore(ref, ex) == Matcher.bleuScore(ref, ex)
+    assert Matcher.fastBleuScore(BLEU[0], BLEU[1]) == 1
+    assert Matcher.fastBleuScore(BLEU[0], BLEU[-1]) == 0
+
+@pytest.mark.filterwarnings('ignore::UserWarning')
+def test_fast_bleu_score_matrix():
+    expected = np.array([[Matcher.bleuScore(ref, ex) for ex in BLEU] for ref in BLEU])
+    assert np.allclose(Matcher.fastBleuScoreMatrix(BLEU, BLEU), expected, rtol = 0, atol = 1e-12)
+    assert (Matcher.fastBleuMatchMatrix(BLEU, BLEU, ignoreStopwords = True, ignoreCase = True) ==
+            (expected > Matcher.BLEU_THRESHOLD)).all()
+
+BOW = [extraction("opened", "John", "the bridge"),
+       extraction("opened", "the bridge", "John"),       # Reordered words
+       extraction("Opened", "JOHN", "the Bridge"),       # Differs by case only
+       extraction("opened", "John", "a bridge"),         # Differs by a stopword only
+       extraction("opened", "John", "bridge"),
+       extraction("opened", "John John", "the bridge"),  # Repeated word
+       extraction("closed", "John", "the bridge"),
+       extraction("opened", "")]
+
+def test_bow_match_hash_join():
+    for ignoreStopwords, ignoreCase in itertools.product([True, False], repeat = 2):
+        # Checking every pair
+        expected = [next((j for j, ex in enumerate(BOW)
+                          if Matcher.bowMatch(ref, ex, ignoreStopwords = ignoreStopwords, ignoreCase = ignoreCase)),
+                         None)
+                    for ref in BOW]
+        assert Matcher.firstMatches(Matcher.bowMatch, BOW, BOW,
+                                    ignoreStopwords = ignoreStopwords, ignoreCase = ignoreCase) == expected
+    # Case, stopwords and order are all ignored, repetitions aren't
+    assert Matcher.firstMatches(Matcher.bowMatch, BOW, BOW, ignoreStopwords = True, ignoreCase = True) == \
+        [0, 0, 0, 0, 0, 5, 6, 7]
+    assert Matcher.firstMatches(Matcher.bowMatch, BOW, BOW, ignoreStopwords = False, ignoreCase = False) == \
+        [0, 0, 2, 3, 4, 5, 6, 7]
+
+def test_lemma_ids_of(monkeypatch):
+    # Words are found by their id, whatever the vocabulary's order
+    monkeypatch.setattr(Matcher, 'vocab', {'visits': 1, 'opened': 0})
+    monkeypatch.setattr(Matcher, 'lemmaOf', np.zeros(0, dtype = np.int64))
+    lemmaIds = Matcher.lemmaIdsOf(np.array([1, 0, 1]))
+    words = dict([(i, w) for w, i in Matcher.vocab.items()])
+    assert [words[i] for i in lemmaIds] == [lemmatizer.lemmatize(w) for w in ['visits', 'opened', 'visits']]
@@ -0,0 +1,29 @@
+"""
+Tests of reading and atomically writing the benchmark's pickled files.
+"""
+import os
+import pytest
+from pickle_file import readPickle, writePickle
+
+def test_round_trip(tmp_path):
+    fn = str(tmp_path / "data.pkl")
+    assert readPickle(fn, "data") is None
+    writePickle({'version': 1}, fn, "data")
+    writePickle({'version': 2}, fn, "data")
+    assert readPickle(fn, "data") == {'version': 2}
+    # Only the file itself is left, readable by all
+    assert os.listdir(str(tmp_path)) == ["data.pkl"]
+    assert os.stat(fn).st_mode & 0o777 == 0o644
+
+def test_failures(tmp_path):
+    fn = str(tmp_path / "data.pkl")
+    with open(fn, 'wb') as fout:
+        fout.write(b'truncated')
+    assert readPickle(fn, "data") is None
+    # Objects which can't be pickled leave the previous file in place
+    with pytest.raises(Exception):
+        writePickle(lambda: None, fn, "data")
+    assert os.listdir(str(tmp_path)) == ["data.pkl"]
+    # Neither are missing directories created
+    writePickle({}, str(tmp_path / "missing" / "data.pkl"), "data")
+    assert os.listdir(str(tmp_path)) == ["data.pkl"]
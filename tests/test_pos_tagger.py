@@ -0,0 +1,27 @@
+"""
+Tests of the memoized, batched POS tagging used to filter pronoun arguments.
+"""
+import nltk
+from oie_readers.posTagger import PosTagger
+
+# Tags as a tagger would, where "mine" is a noun (as in "a gold mine")
+TAGS = {'us': 'PRP', 'her': 'PRP$', 'mine': 'NN', 'book': 'NN'}
+
+def test_is_pronoun(monkeypatch):
+    calls = []
+    def posTagSents(sentences):
+        calls.append(sentences)
+        return [[(word, TAGS[word]) for word in words] for words in sentences]
+    monkeypatch.setattr(nltk, 'pos_tag_sents', posTagSents)
+
+    tagger = PosTagger()
+    sent = "They gave us her book , not mine ."
+    for word in TAGS:
+        tagger.register(sent, [word])
+    # Every word goes through the tagger, the first of them tags the rest of the sentence's words
+    assert [tagger.isPronoun(word, sent) for word in TAGS] == [True, True, False, False]
+    assert sorted(calls[0]) == [[word] for word in sorted(TAGS)]
+    assert len(calls) == 1
+    # and the tags are then cached
+    assert tagger.isPronoun('us')
+    assert len(calls) == 1
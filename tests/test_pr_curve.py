@@ -0,0 +1,53 @@
+"""
+Tests of PRCurve on small curves with ties and full recall.
+"""
+import numpy as np
+from pr_curve import PRCurve
+
+# Expected values follow scikit-learn 0.18's precision_recall_curve: scores which are np.isclose
+# form a single threshold, and the curve stops at the first threshold attaining full recall
+
+def test_curve_stops_at_full_recall():
+    curve = PRCurve([1, 0, 1, 1, 0], [0.9, 0.8, 0.8, 0.5, 0.1])
+    p, r, thresholds = curve.curve()
+    # The 0.1 threshold doesn't add recall, so it's left out
+    assert np.allclose(p, [3 / 4., 2 / 3., 1, 1])
+    assert np.allclose(r, [1, 2 / 3., 1 / 3., 0])
+    assert np.allclose(thresholds, [0.5, 0.8, 0.9])
+    assert np.isclose(curve.auc(), 61 / 72.)
+    f1, precision, recall, threshold = curve.maxF1()
+    assert np.isclose(f1, 6 / 7.)
+    assert (precision, recall, threshold) == (0.75, 1.0, 0.5)
+
+def test_close_scores_are_tied():
+    # The first two scores are a single threshold, at the lower of them
+    curve = PRCurve([0, 1, 1], [0.7, 0.7 + 1e-12, 0.3])
+    p, r, thresholds = curve.curve()
+    assert np.allclose(p, [2 / 3., 1 / 2., 1])
+    assert np.allclose(r, [1, 1 / 2., 0])
+    assert np.allclose(thresholds, [0.3, 0.7])
+
+def test_recall_multiplier():
+    # Half of the gold wasn't reached by any prediction
+    curve = PRCurve([1, 0, 1, 1, 0], [0.9, 0.8, 0.8, 0.5, 0.1], recallMultiplier = 0.5)
+    p, r, _ = curve.curve()
+    assert np.allclose(p, [3 / 4., 2 / 3., 1, 1])
+    assert np.allclose(r, [1 / 2., 1 / 3., 1 / 6., 0])
+
+def test_sorted_curve_with_equal_recalls():
+    # Adding a false positive at a lower threshold keeps the recall, and the curve stops before it
+    p, r = PRCurve([1, 1, 0], [0.9, 0.5, 0.1]).sortedCurve()
+    assert np.allclose(p, [1, 1, 1])
+    assert np.allclose(r, [0, 1 / 2., 1])
+    # Equal recalls keep the curve's order, by increasing threshold
+    p, r = PRCurve([1, 0, 1], [0.9, 0.5, 0.1]).sortedCurve()
+    assert np.allclose(p, [1, 1 / 2., 1, 2 / 3.])
+    assert np.allclose(r, [0, 1 / 2., 1 / 2., 1])
+
+def test_precision_at_and_at():
+    curve = PRCurve([1, 0, 1, 1, 0], [0.9, 0.8, 0.8, 0.5, 0.1])
+    assert curve.precisionAt(0) == 1.0
+    assert curve.precisionAt(1) == 1.0
+    assert curve.precisionAt(10) == 3 / 5.
+    assert curve.at(0.8) == (2 / 3., 2 / 3.)
+    assert curve.at(0.95) == (1.0, 0.0)
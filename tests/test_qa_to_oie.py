@@ -0,0 +1,75 @@
+"""
+Tests of the answer consolidation in the QA-SRL conversion.
+"""
+from qa_to_oie import Qa2OIE, is_str_subset
+
+# (s1, s2, whether the words of s1 appear in s2 in the same order)
+SUBSETS = [("the man", "the old man", True),
+           ("man the", "the old man", False),
+           ("a a", "a b a", True),
+           ("a a a", "a b a", False),
+           ("b a b", "a b a b", True),
+           ("John", "John and Mary", True),
+           ("Mary John", "John and Mary", False),
+           ("x  y", "x y", True),
+           ("x y", "x  y", True),
+           ("", "x", True),
+           ("x", "", False)]
+
+def test_is_str_subset():
+    for s1, s2, expected in SUBSETS:
+        assert is_str_subset(s1, s2) == expected
+
+def test_consolidate_answers():
+    # consolidate_answers doesn't depend on the converted file
+    q = Qa2OIE.__new__(Qa2OIE)
+    # Only answers which don't contain another answer are kept
+    assert q.consolidate_answers(["the man", "the old man", "man"]) == ["man"]
+    assert q.consolidate_answers(["John", "John and Mary", "Mary"]) == ["John", "Mary"]
+    assert q.consolidate_answers(["in the house", "the house in the city"]) == ["in the house", "the house in the city"]
+    assert q.consolidate_answers(["one"]) == ["one"]
+    assert q.consolidate_answers([]) == []
+    # Repeated answers contain each other
+    assert q.consolidate_answers(["same", "same"]) == []
+
+QA_SENTENCE = "John gave Mary a book ."
+# The predicate "gave" is annotated twice, and both annotations have "John gave a book"
+WHO = "who\t_\t_\tgave\tsomething\t_\t_\t?\tJohn"
+WHAT = "what\t_\tsomeone\tgave\t_\t_\t_\t?\t"
+QA_SRL = '\n'.join(["WIKI1_0\t6", QA_SENTENCE,
+                    "1\tgave\t2", WHO, WHAT + "a book###Mary",
+                    "1\tgave\t2", WHO, WHAT + "a book###the book",
+                    ""]) + '\n'
+
+def convert(tmp_path, max_combinations = None):
+    qa_fn = str(tmp_path / "sentence.qa")
+    with open(qa_fn, 'w') as fout:
+        fout.write(QA_SRL)
+    q = Qa2OIE(qa_fn, max_combinations = max_combinations)
+    [(sent, lines)] = list(q.getExtractions(qa_fn))
+    assert sent == QA_SENTENCE
+    return q, [line.split('\t')[3::2] for line in lines]
+
+def test_expand_answers(tmp_path):
+    q, answers = convert(tmp_path)
+    assert answers == [["John", "a book"], ["John", "Mary"], ["John", "the book"]]
+    assert (q.duplicateCombinations, q.cappedCombinations) == (1, 0)
+
+def test_expand_answers_capped(tmp_path):
+    # The repeated extraction doesn't count towards the second annotation's cap
+    q, answers = convert(tmp_path, max_combinations = 1)
+    assert answers == [["John", "a book"], ["John", "the book"]]
+    assert (q.duplicateCombinations, q.cappedCombinations) == (1, 1)
+
+def test_repeated_sentence(tmp_path):
+    # A repeated sentence is read at its first position, with its last annotation
+    qa_fn = str(tmp_path / "repeated.qa")
+    other = "Mary read the book ."
+    with open(qa_fn, 'w') as fout:
+        fout.write('\n'.join(["WIKI1_0\t6", QA_SENTENCE, "1\tgave\t1", WHO, "",
+                              "WIKI1_1\t5", other, "1\tread\t1", "who\t_\t_\tread\tsomething\t_\t_\t?\tMary", "",
+                              "WIKI1_2\t6", QA_SENTENCE, "1\tgave\t1", WHAT + "a book", ""]) + '\n')
+    sentences = list(Qa2OIE(qa_fn).readSentences(qa_fn))
+    assert [sent for sent, _ in sentences] == [QA_SENTENCE, other]
+    [(_, _, [question])] = sentences[0][1]
+    assert question[-1] == "a book"
@@ -0,0 +1,35 @@
+"""
+Tests of SpanLocator, which finds patterns in a sentence ignoring its spaces.
+"""
+from span_locator import SpanLocator
+from qa_to_oie import all_index
+
+SENTENCE = "The man saw the man in the house ."
+
+def test_find():
+    locator = SpanLocator(SENTENCE, ["the man", "man", "house", "The"])
+    # Offsets are in the sentence without spaces
+    assert locator.find("the man") == [9]
+    assert locator.find("man") == [3, 12]
+    assert locator.find("house") == [20]
+    assert locator.find("The") == [0]
+
+def test_find_like_all_index():
+    cases = [("aaaa", ["aa", "a", "aaa"]),          # Overlapping occurrences
+             ("ab ab aba", ["ab", "aba", "ba", "b a"]),
+             ("The man saw THE MAN", ["the man", "The", "x"]),
+             ("", ["a", ""]),
+             ("a b", ["", " "])]                   # Patterns which are empty once normalized
+    for sent, patterns in cases:
+        for matchCase in [True, False]:
+            for ignoreSpaces in [True, False]:
+                locator = SpanLocator(sent, patterns, matchCase = matchCase, ignoreSpaces = ignoreSpaces)
+                for pattern in patterns:
+                    assert locator.find(pattern) == all_index(sent, pattern, matchCase = matchCase,
+                                                              ignoreSpaces = ignoreSpaces)
+
+def test_find_unknown_pattern():
+    # Patterns which weren't given in advance are still found
+    locator = SpanLocator(SENTENCE, ["house"])
+    assert locator.find("the") == all_index(SENTENCE, "the")
+    assert locator.find("the") == [9, 17]
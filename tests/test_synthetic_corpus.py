@@ -0,0 +1,30 @@
+"""
+Tests of the synthetic corpus generator, run as documented in the README.
+"""
+import os
+import sys
+import subprocess
+from benchmark import READERS
+from synthetic_corpus import SyntheticCorpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_documented_command(gold_fn, tmp_path):
+    # The README's command, on a small gold and fewer sentences, taking the distractors from
+    # the default samples (the shipped manifest)
+    outdir = str(tmp_path / "synthetic")
+    subprocess.check_call([sys.executable, 'synthetic_corpus.py', '--gold={}'.format(gold_fn),
+                           '--outdir={}'.format(outdir), '--sentences=100', '--extractions=4',
+                           '--match-rate=0.3', '--confidence=beta:5,2', '--distractor-confidence=beta:2,5',
+                           '--check'],
+                          cwd = ROOT)
+    assert sorted(os.listdir(outdir)) == sorted(['gold.oie', 'raw_sentences.txt'] +
+                                                ['{}.txt'.format(fmt) for fmt in READERS])
+    with open(os.path.join(outdir, 'gold.oie')) as fin:
+        assert len(set(line.split('\t')[0] for line in fin)) == 100
+
+def test_missing_samples(stanford_fn, tmp_path):
+    distractors = SyntheticCorpus.readDistractors([('stanford', str(tmp_path / "missing.txt")),
+                                                   ('stanford', stanford_fn)])
+    assert distractors[0] == ("opened", ["John Smith", "the new bridge"])
+    assert len(distractors) == 7